@@ -0,0 +1,141 @@
+"""
+BM25 keyword index for document chunks
+"""
+import re
+import math
+import numpy as np
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+
+# Latin words and digit runs, or runs of CJK characters
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into BM25 terms
+    
+    Latin words are kept whole. Chinese has no word separators, so CJK runs
+    are split into overlapping character bigrams (a lone character is kept
+    as is).
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of terms, with repeats
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token[0].isascii() or len(token) == 1:
+            terms.append(token)
+        else:
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return terms
+
+
+class BM25Index:
+    """
+    Inverted index scoring documents with Okapi BM25
+    
+    Postings map each term to the documents containing it and the term
+    frequency there, so scoring a query only touches the postings of its
+    own terms instead of rescanning document texts.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index
+        
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_lens: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_len = 0
+    
+    def __len__(self) -> int:
+        return len(self._doc_lens)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lens
+    
+    def add(self, doc_id: str, text: str):
+        """Index text under doc_id, replacing any previous text for it"""
+        self.remove(doc_id)
+        
+        terms = tokenize(text)
+        counts = Counter(terms)
+        for term, tf in counts.items():
+            self._postings[term][doc_id] = tf
+        self._doc_lens[doc_id] = len(terms)
+        self._doc_terms[doc_id] = list(counts)
+        self._total_len += len(terms)
+    
+    def remove(self, doc_id: str):
+        """Drop doc_id from the index, if present"""
+        doc_len = self._doc_lens.pop(doc_id, None)
+        if doc_len is None:
+            return
+        
+        self._total_len -= doc_len
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+    
+    def scores(self, query: str, doc_ids: List[str]) -> np.ndarray:
+        """
+        BM25 scores of doc_ids for query
+        
+        Args:
+            query: Query text
+            doc_ids: Documents to score; ids not in the index score 0
+            
+        Returns:
+            float64 array of scores, aligned with doc_ids
+        """
+        scores = np.zeros(len(doc_ids), dtype=np.float64)
+        n_docs = len(self._doc_lens)
+        if not n_docs:
+            return scores
+        
+        avg_len = self._total_len / n_docs
+        doc_lens = np.fromiter(
+            (self._doc_lens.get(doc_id, 0) for doc_id in doc_ids), dtype=np.float64, count=len(doc_ids)
+        )
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lens / max(avg_len, 1e-9))
+        
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            tf = np.fromiter((postings.get(doc_id, 0) for doc_id in doc_ids), dtype=np.float64, count=len(doc_ids))
+            scores += idf * tf * (self.k1 + 1) / (tf + length_norm)
+        
+        return scores
+    
+    def to_dict(self) -> Dict:
+        """Serializable form of the index"""
+        return {'postings': self._postings, 'doc_lens': self._doc_lens}
+    
+    @classmethod
+    def from_dict(cls, data: Dict, k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """Rebuild an index saved with to_dict"""
+        index = cls(k1, b)
+        index._postings.update(data.get('postings', {}))
+        index._doc_lens = dict(data.get('doc_lens', {}))
+        index._total_len = sum(index._doc_lens.values())
+        for term, postings in index._postings.items():
+            for doc_id in postings:
+                index._doc_terms.setdefault(doc_id, []).append(term)
+        return index
@@ -2,31 +2,105 @@
 Core configuration and utilities for the Gugugu API
 """
 import os
-from openai import OpenAI
+import asyncio
+from functools import lru_cache
+from typing import Optional
+import httpx
+from openai import AsyncOpenAI
 
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2, installed by httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
-def get_ai_client() -> OpenAI:
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
     """
-    Initialize and return OpenAI client with environment configuration
+    Return the process-wide HTTP client used for AI service calls
+    
+    Idle connections are kept open for AI_KEEPALIVE_EXPIRY seconds so bursts
+    reuse them instead of repeating the TLS handshake. With AI_HTTP2=true and
+    the h2 package installed, concurrent calls are multiplexed over HTTP/2.
     
     Returns:
-        OpenAI: Configured OpenAI client instance
+        httpx.AsyncClient: Shared client with a pooled, keep-alive connection limit
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("AI_MAX_CONNECTIONS", "2000")),
+            max_keepalive_connections=int(os.getenv("AI_MAX_KEEPALIVE_CONNECTIONS", "500")),
+            keepalive_expiry=float(os.getenv("AI_KEEPALIVE_EXPIRY", "60"))
+        ),
+        http2=HTTP2_AVAILABLE and os.getenv("AI_HTTP2", "False").lower() == "true",
+        # Generations can take minutes, but an unreachable service should fail fast
+        timeout=httpx.Timeout(120.0, connect=5.0)
+    )
+
+
+@lru_cache(maxsize=1)
+def get_ai_client() -> AsyncOpenAI:
+    """
+    Initialize and return the async OpenAI client with environment configuration
+    
+    The client is created once and shared, so its HTTP connection pool is
+    reused across requests.
+    
+    Returns:
+        AsyncOpenAI: Configured AsyncOpenAI client instance
         
     Raises:
         ValueError: If OPENAI_API_KEY environment variable is not set
     """
     api_key = os.getenv("OPENAI_API_KEY")
-    base_url = os.getenv("OPENAI_API_BASE")
     
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable is not set")
     
-    return OpenAI(api_key=api_key, base_url=base_url)
+    return AsyncOpenAI(api_key=api_key, base_url=get_api_base(), http_client=get_http_client())
 
 
+async def prewarm_ai_connections(count: int = None):
+    """
+    Open keep-alive connections to the AI service ahead of the first request
+    
+    Creates the shared AI client, then sends cheap HEAD requests in parallel
+    through its HTTP client so the DNS, TCP and TLS setup is paid at
+    startup. Failures are ignored.
+    
+    Args:
+        count: Number of connections to open, defaults to AI_PREWARM_CONNECTIONS (8)
+    """
+    if count is None:
+        count = int(os.getenv("AI_PREWARM_CONNECTIONS", "8"))
+    if count <= 0 or not os.getenv("OPENAI_API_KEY"):
+        return
+    
+    # Build the shared client and read the model now rather than on the first request
+    get_ai_client()
+    get_ai_model()
+    
+    base_url = get_api_base() or "https://api.openai.com/v1"
+    http_client = get_http_client()
+    await asyncio.gather(
+        *(http_client.head(base_url, timeout=5.0) for _ in range(count)),
+        return_exceptions=True
+    )
+
+
+async def close_ai_client():
+    """Close the shared HTTP client, if it was created"""
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+        get_http_client.cache_clear()
+        get_ai_client.cache_clear()
+
+
+@lru_cache(maxsize=1)
 def get_ai_model() -> str:
     """
-    Get the AI model name from environment variables
+    Get the AI model name from environment variables, read once
     
     Returns:
         str: AI model name, defaults to "deepseek-ai/DeepSeek-V3"
@@ -34,6 +108,17 @@ def get_ai_model() -> str:
     return os.getenv("AI_MODEL", "deepseek-ai/DeepSeek-V3")
 
 
+@lru_cache(maxsize=1)
+def get_api_base() -> Optional[str]:
+    """
+    Get the AI service base URL from environment variables, read once
+    
+    Returns:
+        Optional[str]: Value of OPENAI_API_BASE, or None if it is not set
+    """
+    return os.getenv("OPENAI_API_BASE")
+
+
 def get_debug_mode() -> bool:
     """
     Get debug mode setting from environment variables
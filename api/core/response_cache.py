@@ -0,0 +1,104 @@
+"""
+Exact-match response cache for the AI endpoints
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of AI responses keyed by the exact request
+    
+    A hit needs no embedding call, so it is checked before the semantic
+    cache. Entries expire after `ttl` seconds and the least recently used
+    entry is evicted once `max_size` is reached.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl: float = 3600.0):
+        """
+        Initialize the response cache
+        
+        Args:
+            max_size: Maximum number of cached responses
+            ttl: Seconds before a cached response expires
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a live response is cached for key, without counting a hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() - entry[0] < self.ttl
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Find the cached response for a request
+        
+        Args:
+            key: Hashable tuple of everything the response depends on
+            
+        Returns:
+            Cached response, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: Hashable, response: Any):
+        """
+        Cache the response for a request
+        
+        Args:
+            key: Hashable tuple of everything the response depends on
+            response: Response to return for the same request
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0.0
+        }
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+)
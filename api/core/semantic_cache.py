@@ -0,0 +1,181 @@
+"""
+Semantic response cache for the AI endpoints
+"""
+import os
+import time
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+
+class SemanticCache:
+    """
+    In-memory cache of AI responses keyed by message embedding
+    
+    A lookup returns a cached response when a previous message in the same
+    namespace has cosine similarity of at least `threshold` with the new one.
+    Embeddings are rows of one preallocated matrix, so a lookup is a single
+    matrix-vector product and inserts and removals copy one row. Entries
+    expire after `ttl` seconds and the least recently used entry is evicted
+    once `max_size` is reached.
+    """
+    
+    def __init__(self, threshold: float = 0.92, max_size: int = 1024, ttl: float = 3600.0):
+        """
+        Initialize the semantic cache
+        
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            max_size: Maximum number of cached responses
+            ttl: Seconds before a cached response expires
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        
+        self._matrix: Optional[np.ndarray] = None
+        self._namespaces: List[str] = []
+        self._responses: List[Any] = []
+        self._created_at: List[float] = []
+        self._last_used: List[float] = []
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def lookup(self, namespace: str, embedding: np.ndarray) -> Optional[Any]:
+        """
+        Find a cached response for a similar message
+        
+        Args:
+            namespace: Endpoint and parameters the response depends on
+            embedding: L2-normalized embedding of the message
+            
+        Returns:
+            Cached response, or None on a miss
+        """
+        with self._lock:
+            best = self._best_match(namespace, embedding)
+            if best is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._last_used[best] = time.monotonic()
+            return self._responses[best]
+    
+    def store(self, namespace: str, embedding: np.ndarray, response: Any):
+        """
+        Cache a response for a message embedding
+        
+        Args:
+            namespace: Endpoint and parameters the response depends on
+            embedding: L2-normalized embedding of the message
+            response: Response to return for similar messages
+        """
+        # A size of 0 or less turns the cache off
+        if self.max_size <= 0:
+            return
+        
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        now = time.monotonic()
+        
+        with self._lock:
+            self._evict_expired(now)
+            if len(self._responses) >= self.max_size:
+                self._remove(int(np.argmin(self._last_used)))
+            
+            if self._matrix is None or self._matrix.shape[1] != embedding.shape[1]:
+                self._clear()
+                self._matrix = np.empty((self.max_size, embedding.shape[1]), dtype=np.float32)
+            self._matrix[len(self._responses)] = embedding[0]
+            self._namespaces.append(namespace)
+            self._responses.append(response)
+            self._created_at.append(now)
+            self._last_used.append(now)
+    
+    def invalidate(self, prefix: str = ""):
+        """
+        Drop cached responses whose namespace starts with prefix
+        
+        Args:
+            prefix: Namespace prefix to drop, or "" to clear the whole cache
+        """
+        with self._lock:
+            for i in reversed(range(len(self._namespaces))):
+                if self._namespaces[i].startswith(prefix):
+                    self._remove(i)
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._responses),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0.0
+        }
+    
+    def _best_match(self, namespace: str, embedding: np.ndarray) -> Optional[int]:
+        """Index of the most similar live entry in namespace above threshold"""
+        if not self._responses:
+            return None
+        
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if embedding.shape[0] != self._matrix.shape[1]:
+            return None
+        
+        scores = self._matrix[:len(self._responses)] @ embedding
+        
+        now = time.monotonic()
+        valid = np.fromiter(
+            (ns == namespace and now - created < self.ttl
+             for ns, created in zip(self._namespaces, self._created_at)),
+            dtype=bool,
+            count=len(self._namespaces)
+        )
+        scores = np.where(valid, scores, -np.inf)
+        
+        best = int(np.argmax(scores))
+        return best if scores[best] >= self.threshold else None
+    
+    def _evict_expired(self, now: float):
+        """Remove entries older than ttl"""
+        for i in reversed(range(len(self._created_at))):
+            if now - self._created_at[i] >= self.ttl:
+                self._remove(i)
+    
+    def _remove(self, i: int):
+        """Remove entry i, moving the last entry into its slot"""
+        last = len(self._responses) - 1
+        if i != last:
+            self._matrix[i] = self._matrix[last]
+            self._namespaces[i] = self._namespaces[last]
+            self._responses[i] = self._responses[last]
+            self._created_at[i] = self._created_at[last]
+            self._last_used[i] = self._last_used[last]
+        self._namespaces.pop()
+        self._responses.pop()
+        self._created_at.pop()
+        self._last_used.pop()
+    
+    def _clear(self):
+        """Remove every entry"""
+        self._matrix = None
+        self._namespaces = []
+        self._responses = []
+        self._created_at = []
+        self._last_used = []
+
+
+# Global semantic cache instance
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    max_size=int(os.getenv("SEMANTIC_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+)
@@ -2,14 +2,151 @@
 Vector store for document embedding and retrieval
 """
 import os
+import re
+import asyncio
 import json
 import hashlib
+import threading
+import time
 import numpy as np
-from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, NamedTuple, Optional, Tuple
 from pathlib import Path
-from openai import OpenAI
-from sklearn.metrics.pairwise import cosine_similarity
+from openai import OpenAI, AsyncOpenAI
 import markdown
+from api.core.bm25 import BM25Index
+from api.core.config import get_http_client
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
+
+try:
+    import simsimd
+except ImportError:  # Fall back to numpy's BLAS matmul
+    simsimd = None
+
+try:
+    import hnswlib
+except ImportError:  # Always use exact search
+    hnswlib = None
+
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBEDDING_DIM = 1536
+
+# Stores with at least this many chunks answer unscoped searches from an
+# HNSW index (when hnswlib is installed) instead of scanning every row
+ANN_MIN_ROWS = 10000
+ANN_EF_SEARCH = 64
+ANN_CANDIDATE_FACTOR = 4
+
+# Recent search query embeddings kept in memory, and for how many seconds
+QUERY_CACHE_SIZE = 2048
+QUERY_CACHE_TTL = 600.0
+
+# Length of the chunk excerpt returned as content_preview
+PREVIEW_LENGTH = 200
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize vectors along the last axis as float32"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _write_json(path: Path, obj, indent: bool = True):
+    """Write obj as UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=option))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2 if indent else None)
+
+
+def _read_json(path: Path):
+    """Read a JSON file, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json_lines(path: Path, items: List):
+    """Write items as JSON Lines, one encoded item per line"""
+    with open(path, 'wb') as f:
+        if orjson is not None:
+            f.writelines(orjson.dumps(item) + b'\n' for item in items)
+        else:
+            f.writelines((json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8') for item in items)
+
+
+def _read_json_lines(path: Path) -> List:
+    """Read a JSON Lines file written by _write_json_lines"""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, 'rb') as f:
+        return [loads(line) for line in f if line.strip()]
+
+
+def _save_array(path: Path, array: np.ndarray):
+    """Save array as .npy through a temporary file, since the old file may be memory-mapped"""
+    tmp_file = path.with_name(path.name + ".tmp")
+    with open(tmp_file, 'wb') as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_file, path)
+
+
+def _dot_scores(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Dot product of every row of matrix with query, using SimSIMD when installed"""
+    if simsimd is not None and matrix.shape[0] > 0:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        query = np.ascontiguousarray(query, dtype=np.float32).reshape(1, -1)
+        return np.asarray(simsimd.cdist(query, matrix, metric='dot'))[0]
+    return matrix @ query
+
+
+def _detect_game_type(file_name: str) -> str:
+    """Classify a document by the game its file name refers to"""
+    lowered = file_name.lower()
+    if 'splendor' in lowered:
+        return 'splendor'
+    if 'catan' in lowered:
+        return 'catan'
+    return 'generic'
+
+
+def _display_fields(chunk_id: str, content: str) -> Tuple[str, str, str]:
+    """File name, game type and content preview shown for a chunk in API responses"""
+    file_name = os.path.basename(chunk_id.rsplit('#', 1)[0])
+    if len(content) > PREVIEW_LENGTH:
+        return file_name, _detect_game_type(file_name), content[:PREVIEW_LENGTH] + "..."
+    return file_name, _detect_game_type(file_name), content
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort"""
+    k = min(k, scores.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.size:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(scores.size)
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+class ProcessResult(NamedTuple):
+    """Outcome of adding a document to the vector store"""
+    success: bool
+    resolved_path: str
+    chunk_count: int = 0
 
 
 class DocumentVectorStore:
@@ -30,13 +167,91 @@ class DocumentVectorStore:
         current_dir = Path(__file__).parent.parent.parent
         self.document_dir = current_dir / document_dir
         
-        self.embeddings: Dict[str, np.ndarray] = {}
-        self.documents: Dict[str, Dict] = {}
         self.file_metadata: Dict[str, Dict] = {}
         
+        # Reverse index: file path -> chunk ids stored for that file
+        self._file_to_chunks: Dict[str, List[str]] = defaultdict(list)
+        
+        self._client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_query_client: Optional[AsyncOpenAI] = None
+        self._async_http_client = None
+        
+        # Chunk embeddings by content hash. Values loaded from disk are rows of
+        # the memory-mapped embed_cache.npy; _embed_cache_dirty marks changes
+        # not saved yet.
+        self._embed_cache: Dict[str, np.ndarray] = {}
+        self._embed_cache_dirty = False
+        
+        # Query LRU: sha1(model, query) -> (expiry time, embedding)
+        self._query_cache: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._query_cache_lock = threading.RLock()
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+        
+        # Chunks in columnar layout: row i of the (n_chunks, dim) matrix of
+        # unit-length embeddings belongs to chunk _ids[i] with text _contents[i].
+        # Chunk ids are "<file_path>#<chunk_index>"; _rows maps id -> row.
+        self._matrix: np.ndarray = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        self._ids: List[str] = []
+        self._contents: List[str] = []
+        self._rows: Dict[str, int] = {}
+        
+        # Response fields derived once per chunk rather than per request
+        self._file_names: List[str] = []
+        self._game_types: List[str] = []
+        self._previews: List[str] = []
+        
+        # Optional approximate index over matrix rows (labels are row numbers).
+        # It is built once the store reaches ANN_MIN_ROWS and then kept in
+        # step with every add and removal; _mutations counts those changes
+        # so a build running outside the lock can tell it went stale.
+        self._ann_index = None
+        self._mutations = 0
+        
+        # Held while chunks are scanned or modified, since scans run in worker threads
+        self._index_lock = threading.RLock()
+        
+        # Keyword index over chunk texts, used when reranking
+        self._bm25 = BM25Index()
+        
         # Load existing data
         self._load_data()
     
+    def _get_client(self) -> OpenAI:
+        """Return the embedding client, creating it on first use"""
+        if self._client is None:
+            self._client = OpenAI(
+                api_key=os.getenv("DEEPSEEK_API_KEY"),
+                base_url=os.getenv("OPENAI_API_BASE", "https://api.deepseek.com")
+            )
+        return self._client
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        Return the async embedding client, creating it on first use
+        
+        It shares the application's pooled HTTP client, so it reuses the
+        pre-warmed connections and is closed on shutdown. The client is
+        recreated if that HTTP client was replaced.
+        """
+        http_client = get_http_client()
+        if self._async_client is None or self._async_http_client is not http_client:
+            self._async_client = AsyncOpenAI(
+                api_key=os.getenv("DEEPSEEK_API_KEY"),
+                base_url=os.getenv("OPENAI_API_BASE", "https://api.deepseek.com"),
+                http_client=http_client
+            )
+            # Query embeddings sit in front of request handling, so they fail fast
+            self._async_query_client = self._async_client.with_options(max_retries=0)
+            self._async_http_client = http_client
+        return self._async_client
+    
+    def _get_async_query_client(self) -> AsyncOpenAI:
+        """Return the async embedding client for search queries, which does not retry"""
+        self._get_async_client()
+        return self._async_query_client
+    
     def _get_embedding(self, text: str) -> np.ndarray:
         """
         Get embedding for text using OpenAI's embedding model
@@ -45,25 +260,373 @@ class DocumentVectorStore:
             text: Text to embed
             
         Returns:
-            numpy array of embedding
+            L2-normalized float32 numpy array of embedding
         """
-        try:
-            client = OpenAI(
-                api_key=os.getenv("DEEPSEEK_API_KEY"),
-                base_url=os.getenv("OPENAI_API_BASE", "https://api.deepseek.com")
-            )
+        return self._get_embeddings_batch([text])[0]
+    
+    def embed_query(self, query: str, fallback: bool = True) -> Optional[np.ndarray]:
+        """
+        Get embedding for a search query through an in-memory LRU cache
+        
+        Queries are kept out of the persistent chunk embedding cache, so
+        arbitrary search traffic does not grow embed_cache.npz.
+        
+        Args:
+            query: Search query
+            fallback: Return a random development embedding if the API call
+                fails; when False, return None instead
             
-            response = client.embeddings.create(
-                input=text,
-                model="text-embedding-ada-002"
-            )
+        Returns:
+            L2-normalized float32 numpy array of embedding
+        """
+        embeddings = self.embed_queries([query], fallback)
+        return None if embeddings is None else embeddings[0]
+    
+    def embed_queries(self, queries: List[str], fallback: bool = True) -> Optional[np.ndarray]:
+        """
+        Get embeddings for several search queries with a single API call
+        
+        Args:
+            queries: Search queries
+            fallback: Return random development embeddings if the API call
+                fails; when False, return None instead
+            
+        Returns:
+            (len(queries), dim) float32 matrix of L2-normalized embeddings
+        """
+        found, missing = self._lookup_queries(queries)
+        
+        if missing:
+            try:
+                response = self._get_client().embeddings.create(
+                    input=list(missing),
+                    model=EMBEDDING_MODEL
+                )
+            except Exception as e:
+                return self._fallback_queries(queries, found, missing, e, fallback)
+            self._cache_query_response(found, missing, response)
+        
+        return np.vstack([found[query] for query in queries])
+    
+    async def embed_query_async(self, query: str, fallback: bool = True) -> Optional[np.ndarray]:
+        """Async variant of embed_query"""
+        embeddings = await self.embed_queries_async([query], fallback)
+        return None if embeddings is None else embeddings[0]
+    
+    async def embed_queries_async(self, queries: List[str], fallback: bool = True) -> Optional[np.ndarray]:
+        """Async variant of embed_queries"""
+        found, missing = self._lookup_queries(queries)
+        
+        if missing:
+            try:
+                response = await self._get_async_query_client().embeddings.create(
+                    input=list(missing),
+                    model=EMBEDDING_MODEL
+                )
+            except Exception as e:
+                return self._fallback_queries(queries, found, missing, e, fallback)
+            self._cache_query_response(found, missing, response)
+        
+        return np.vstack([found[query] for query in queries])
+    
+    def _lookup_queries(self, queries: List[str]) -> Tuple[Dict[str, np.ndarray], Dict[str, str]]:
+        """Split queries into cached embeddings and {query: embedding cache key} to fetch"""
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        with self._query_cache_lock:
+            now = time.monotonic()
+            for query in queries:
+                if query in found or query in missing:
+                    continue
+                cache_key = self._query_cache_key(query)
+                cached = self._query_cache.get(cache_key)
+                if cached is not None and cached[0] > now:
+                    self._query_cache.move_to_end(cache_key)
+                    found[query] = cached[1]
+                    self.query_cache_hits += 1
+                    continue
+                key = self._embedding_cache_key(query)
+                if key in self._embed_cache:
+                    found[query] = self._embed_cache[key]
+                    self.query_cache_hits += 1
+                else:
+                    missing[query] = key
+                    self.query_cache_misses += 1
+        return found, missing
+    
+    def _cache_query_response(self, found: Dict[str, np.ndarray], missing: Dict[str, str], response):
+        """Add fetched query embeddings to found and remember all of found in the LRU"""
+        data = sorted(response.data, key=lambda d: d.index)
+        found.update(zip(missing, _normalize([d.embedding for d in data])))
+        
+        with self._query_cache_lock:
+            expires_at = time.monotonic() + QUERY_CACHE_TTL
+            for query, embedding in found.items():
+                cache_key = self._query_cache_key(query)
+                self._query_cache[cache_key] = (expires_at, embedding)
+                self._query_cache.move_to_end(cache_key)
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+    
+    def _fallback_queries(self, queries: List[str], found: Dict[str, np.ndarray], missing: Dict[str, str],
+                          error: Exception, fallback: bool) -> Optional[np.ndarray]:
+        """Query embeddings after a failed API call, or None when fallback is off"""
+        if not fallback:
+            print(f"Error getting embedding: {error}")
+            return None
+        
+        # Development embeddings are random, so they are not cached
+        vectors = self._fallback_embeddings([(key, query) for query, key in missing.items()], error)
+        found.update((query, vectors[key]) for query, key in missing.items())
+        return np.vstack([found[query] for query in queries])
+    
+    def query_cache_stats(self) -> Dict:
+        """
+        Get query embedding cache statistics
+        
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        with self._query_cache_lock:
+            total = self.query_cache_hits + self.query_cache_misses
+            return {
+                'size': len(self._query_cache),
+                'hits': self.query_cache_hits,
+                'misses': self.query_cache_misses,
+                'hit_rate': self.query_cache_hits / total if total > 0 else 0.0
+            }
+    
+    @staticmethod
+    def _query_cache_key(query: str) -> str:
+        """Query LRU key; it includes the model so a model change misses"""
+        return hashlib.sha1(f"{EMBEDDING_MODEL}\0{query}".encode()).hexdigest()
+    
+    def _get_embeddings_batch(self, texts: List[str], batch_size: int = 64) -> List[np.ndarray]:
+        """
+        Get embeddings for several texts with one API call per batch
+        
+        Embeddings are cached by content hash, so texts seen before (in any
+        file or session) are not sent to the API again.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Maximum number of texts sent in a single request
             
-            return np.array(response.data[0].embedding)
+        Returns:
+            List of L2-normalized float32 numpy arrays, in the same order as texts
+        """
+        keys, batches = self._plan_embedding_batches(texts, batch_size)
+        
+        fetched: Dict[str, np.ndarray] = {}
+        for batch in batches:
+            try:
+                response = self._get_client().embeddings.create(
+                    input=[text for _, text in batch],
+                    model=EMBEDDING_MODEL
+                )
+                fetched.update(self._cache_embedding_response(batch, response))
+            except Exception as e:
+                fetched.update(self._fallback_embeddings(batch, e))
+        
+        return [self._embed_cache[key] if key in self._embed_cache else fetched[key] for key in keys]
+    
+    async def _get_embeddings_batch_async(self, texts: List[str], batch_size: int = 64,
+                                          max_concurrency: int = 8) -> List[np.ndarray]:
+        """
+        Async variant of _get_embeddings_batch that keeps several batches in flight
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Maximum number of texts sent in a single request
+            max_concurrency: Maximum number of concurrent embedding requests
             
-        except Exception as e:
-            print(f"Error getting embedding: {e}")
-            # Fallback to random embedding for development
-            return np.random.rand(1536)
+        Returns:
+            List of L2-normalized float32 numpy arrays, in the same order as texts
+        """
+        keys, batches = self._plan_embedding_batches(texts, batch_size)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def embed(batch):
+            async with semaphore:
+                return await self._get_async_client().embeddings.create(
+                    input=[text for _, text in batch],
+                    model=EMBEDDING_MODEL
+                )
+        
+        responses = await asyncio.gather(*(embed(batch) for batch in batches), return_exceptions=True)
+        
+        fetched: Dict[str, np.ndarray] = {}
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                fetched.update(self._fallback_embeddings(batch, response))
+            else:
+                fetched.update(self._cache_embedding_response(batch, response))
+        
+        return [self._embed_cache[key] if key in self._embed_cache else fetched[key] for key in keys]
+    
+    def _plan_embedding_batches(self, texts: List[str], batch_size: int) -> Tuple[List[str], List[List[Tuple[str, str]]]]:
+        """Return cache keys for texts and the (key, text) batches not cached yet"""
+        keys = [self._embedding_cache_key(text) for text in texts]
+        
+        # Only send texts whose embedding is not cached yet
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self._embed_cache and key not in missing:
+                missing[key] = text
+        
+        missing_items = list(missing.items())
+        batches = [missing_items[start:start + batch_size] for start in range(0, len(missing_items), batch_size)]
+        return keys, batches
+    
+    def _cache_embedding_response(self, batch: List[Tuple[str, str]], response) -> Dict[str, np.ndarray]:
+        """Normalize and cache the embeddings returned for batch"""
+        fetched = {}
+        data = sorted(response.data, key=lambda d: d.index)
+        for (key, _), d in zip(batch, data):
+            embedding = _normalize(d.embedding)
+            self._embed_cache[key] = embedding
+            fetched[key] = embedding
+        self._embed_cache_dirty = True
+        return fetched
+    
+    def _prune_embed_cache(self, contents: List[str]):
+        """Drop cached embeddings of removed chunk texts that no stored chunk still uses"""
+        if not contents:
+            return
+        remaining = set(self._contents)
+        for content in set(contents) - remaining:
+            if self._embed_cache.pop(self._embedding_cache_key(content), None) is not None:
+                self._embed_cache_dirty = True
+    
+    @staticmethod
+    def _fallback_embeddings(batch: List[Tuple[str, str]], error: Exception) -> Dict[str, np.ndarray]:
+        """Random embeddings for development when the API call fails (never cached)"""
+        print(f"Error getting embedding: {error}")
+        return {key: _normalize(np.random.rand(EMBEDDING_DIM)) for key, _ in batch}
+    
+    @staticmethod
+    def _embedding_cache_key(text: str) -> str:
+        """Cache key for an embedding: hash of model name and text"""
+        return hashlib.sha256(f"{EMBEDDING_MODEL}\0{text}".encode()).hexdigest()
+    
+    def _add_chunks(self, chunk_ids: List[str], vectors: List[np.ndarray], contents: List[str]):
+        """Append chunks with their unit-length embeddings as new rows"""
+        self._remove_chunks([cid for cid in chunk_ids if cid in self._rows])
+        if not chunk_ids:
+            return
+        
+        new_rows = np.vstack(vectors).astype(np.float32, copy=False)
+        
+        start = len(self._ids)
+        self._matrix = np.vstack([self._matrix, new_rows]) if start else new_rows
+        self._mutations += 1
+        if self._ann_index is not None:
+            if start + len(chunk_ids) > self._ann_index.get_max_elements():
+                self._ann_index.resize_index(start + len(chunk_ids))
+            # Labels of removed rows are reused; hnswlib undeletes and updates them
+            self._ann_index.add_items(new_rows, np.arange(start, start + len(chunk_ids)))
+        for offset, cid in enumerate(chunk_ids):
+            self._rows[cid] = start + offset
+        self._ids.extend(chunk_ids)
+        self._contents.extend(contents)
+        self._extend_display_fields(chunk_ids, contents)
+        for cid, content in zip(chunk_ids, contents):
+            self._bm25.add(cid, content)
+    
+    def _remove_chunks(self, chunk_ids: List[str]):
+        """Remove rows for chunk_ids, moving the last row into each freed slot"""
+        chunk_ids = [cid for cid in chunk_ids if cid in self._rows]
+        if not chunk_ids:
+            return
+        
+        self._mutations += 1
+        
+        # Rows loaded with mmap_mode='r' are read-only
+        if not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix)
+        
+        for cid in chunk_ids:
+            self._bm25.remove(cid)
+            row = self._rows.pop(cid)
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                if self._ann_index is not None:
+                    self._ann_index.add_items(self._matrix[row:row + 1], np.array([row]))
+                self._ids[row] = moved_id
+                self._contents[row] = self._contents[last]
+                self._file_names[row] = self._file_names[last]
+                self._game_types[row] = self._game_types[last]
+                self._previews[row] = self._previews[last]
+                self._rows[moved_id] = row
+            if self._ann_index is not None:
+                self._ann_index.mark_deleted(last)
+            self._ids.pop()
+            self._contents.pop()
+            self._file_names.pop()
+            self._game_types.pop()
+            self._previews.pop()
+        
+        self._matrix = self._matrix[:len(self._ids)]
+    
+    def _extend_display_fields(self, chunk_ids: List[str], contents: List[str]):
+        """Append the precomputed response fields for new rows"""
+        for chunk_id, content in zip(chunk_ids, contents):
+            file_name, game_type, preview = _display_fields(chunk_id, content)
+            self._file_names.append(file_name)
+            self._game_types.append(game_type)
+            self._previews.append(preview)
+    
+    def _get_ann_index(self):
+        """Return the HNSW index over all rows, or None if searches should scan exactly"""
+        if len(self._ids) < ANN_MIN_ROWS:
+            return None
+        return self._ann_index
+    
+    def _ensure_ann_index(self):
+        """
+        Build the HNSW index once the store has ANN_MIN_ROWS rows
+        
+        Called after ingest, in a worker thread. The build works on a copy of
+        the rows without holding the index lock, so searches keep running; if
+        the chunks change meanwhile the result is dropped and the next ingest
+        builds again.
+        """
+        if hnswlib is None:
+            return
+        
+        with self._index_lock:
+            if self._ann_index is not None or len(self._ids) < ANN_MIN_ROWS:
+                return
+            matrix = np.array(self._matrix)
+            mutations = self._mutations
+        
+        index = hnswlib.Index(space='ip', dim=matrix.shape[1])
+        index.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+        index.add_items(matrix, np.arange(len(matrix)))
+        index.set_ef(ANN_EF_SEARCH)
+        
+        with self._index_lock:
+            if self._ann_index is None and self._mutations == mutations:
+                self._ann_index = index
+                index.save_index(str(self.storage_dir / "hnsw.bin"))
+    
+    def _chunk_data(self, row: int) -> Dict:
+        """Build the chunk dict returned by the API for a matrix row"""
+        chunk_id = self._ids[row]
+        file_path, chunk_index = chunk_id.rsplit('#', 1)
+        content = self._contents[row]
+        return {
+            'file_path': file_path,
+            'file_name': self._file_names[row],
+            'game_type': self._game_types[row],
+            'chunk_index': int(chunk_index),
+            'content': content,
+            'content_preview': self._previews[row],
+            'length': len(content),
+            'chunk_id': chunk_id
+        }
     
     def _chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """
@@ -77,20 +640,21 @@ class DocumentVectorStore:
         Returns:
             List of text chunks
         """
-        if len(text) <= chunk_size:
+        text_len = len(text)
+        if text_len <= chunk_size:
             return [text]
         
         chunks = []
         start = 0
         
-        while start < len(text):
+        while start < text_len:
             end = start + chunk_size
             
             # Try to end at a sentence boundary
-            if end < len(text):
-                # Look for sentence endings within the last 100 characters
-                sentence_end = text.rfind('.', start, end)
-                if sentence_end > start + chunk_size - 100:
+            if end < text_len:
+                # Look for sentence endings within the last 100 characters only
+                sentence_end = text.rfind('.', max(start, end - 99), end)
+                if sentence_end != -1:
                     end = sentence_end + 1
             
             chunk = text[start:end].strip()
@@ -98,17 +662,19 @@ class DocumentVectorStore:
                 chunks.append(chunk)
             
             start = end - overlap
-            if start >= len(text):
+            if start >= text_len:
                 break
         
         return chunks
     
     def _get_file_hash(self, file_path: str) -> str:
-        """Get hash of file content for change detection"""
+        """Get hash of file content for change detection, reading it in blocks"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                return hashlib.md5(content.encode()).hexdigest()
+            h = hashlib.blake2b(digest_size=16)
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    h.update(block)
+            return h.hexdigest()
         except Exception:
             return ""
     
@@ -154,7 +720,7 @@ class DocumentVectorStore:
         else:
             raise ValueError("必须提供 file_path 或 file_name 参数")
     
-    def add_document(self, file_path: str = None, file_name: str = None, force_reprocess: bool = False) -> bool:
+    def add_document(self, file_path: str = None, file_name: str = None, force_reprocess: bool = False) -> ProcessResult:
         """
         Add a document to the vector store
         
@@ -164,7 +730,8 @@ class DocumentVectorStore:
             force_reprocess: Force reprocessing even if file hasn't changed
             
         Returns:
-            True if document was processed, False if skipped
+            ProcessResult with success True if the document was processed,
+            False if skipped, and the resolved path and new chunk count
             
         Raises:
             ValueError: If neither file_path nor file_name provided
@@ -172,68 +739,195 @@ class DocumentVectorStore:
         # Resolve the actual file path
         resolved_path = self._resolve_file_path(file_path, file_name)
         
-        # Check if file has changed
-        current_hash = self._get_file_hash(resolved_path)
-        if not force_reprocess and resolved_path in self.file_metadata:
-            if self.file_metadata[resolved_path].get('hash') == current_hash:
-                print(f"File {resolved_path} unchanged, skipping...")
-                return False
+        change = self._detect_change(resolved_path, force_reprocess)
+        if change is None:
+            return ProcessResult(False, resolved_path)
 
         try:
-            # Read file content
-            with open(resolved_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            chunks = self._read_chunks(resolved_path)
+            
+            # Embed all chunks in batched requests
+            embeddings = self._get_embeddings_batch(chunks)
+            
+            self._store_document(resolved_path, chunks, embeddings, *change)
+            return ProcessResult(True, resolved_path, len(chunks))
+            
+        except Exception as e:
+            print(f"Error processing {resolved_path}: {e}")
+            return ProcessResult(False, resolved_path)
+    
+    async def add_document_async(self, file_path: str = None, file_name: str = None,
+                                 force_reprocess: bool = False) -> ProcessResult:
+        """
+        Add a document to the vector store, embedding its chunk batches concurrently
+        
+        Args:
+            file_path: Complete path to the document file (optional, for backward compatibility)
+            file_name: Just the filename (optional, will search in document_dir)
+            force_reprocess: Force reprocessing even if file hasn't changed
+            
+        Returns:
+            ProcessResult with success True if the document was processed,
+            False if skipped, and the resolved path and new chunk count
+            
+        Raises:
+            ValueError: If neither file_path nor file_name provided
+        """
+        resolved_path = self._resolve_file_path(file_path, file_name)
+        
+        change = self._detect_change(resolved_path, force_reprocess)
+        if change is None:
+            return ProcessResult(False, resolved_path)
+        
+        try:
+            chunks = self._read_chunks(resolved_path)
+            embeddings = await self._get_embeddings_batch_async(chunks)
+            await asyncio.to_thread(self._store_document, resolved_path, chunks, embeddings, *change)
+            return ProcessResult(True, resolved_path, len(chunks))
             
-            # Convert markdown to text if needed
-            if resolved_path.endswith('.md'):
-                content = markdown.markdown(content)
-                # Simple HTML tag removal
-                import re
-                content = re.sub(r'<[^>]+>', '', content)
+        except Exception as e:
+            print(f"Error processing {resolved_path}: {e}")
+            return ProcessResult(False, resolved_path)
+    
+    async def add_documents_async(self, documents: List[Tuple[str, bool]]) -> List[ProcessResult]:
+        """
+        Add several documents, embedding the chunks of all of them together
+        
+        Files are read concurrently, their chunks share one set of embedding
+        batches, and the store is saved once at the end.
+        
+        Args:
+            documents: (resolved file path, force_reprocess) pairs
             
-            # Chunk the document
-            chunks = self._chunk_text(content)
+        Returns:
+            A ProcessResult per document; success is False if it was skipped or failed
+        """
+        results = [ProcessResult(False, resolved_path) for resolved_path, _ in documents]
+        
+        # Only the first occurrence of a file in the batch is processed
+        pending = {}
+        for i, (resolved_path, force_reprocess) in enumerate(documents):
+            if resolved_path in pending:
+                continue
+            change = self._detect_change(resolved_path, force_reprocess)
+            if change is not None:
+                pending[resolved_path] = (i, change)
+        
+        paths = list(pending)
+        chunk_lists = await asyncio.gather(
+            *(asyncio.to_thread(self._read_chunks, path) for path in paths),
+            return_exceptions=True
+        )
+        
+        readable = []
+        for path, chunks in zip(paths, chunk_lists):
+            if isinstance(chunks, Exception):
+                print(f"Error processing {path}: {chunks}")
+            else:
+                readable.append((path, chunks))
+        
+        all_chunks = [chunk for _, chunks in readable for chunk in chunks]
+        embeddings = await self._get_embeddings_batch_async(all_chunks)
+        
+        def store_all():
+            offset = 0
+            for path, chunks in readable:
+                i, change = pending[path]
+                try:
+                    self._store_document(path, chunks, embeddings[offset:offset + len(chunks)], *change,
+                                         save=False, index=False)
+                    results[i] = ProcessResult(True, path, len(chunks))
+                except Exception as e:
+                    print(f"Error processing {path}: {e}")
+                offset += len(chunks)
             
+            if any(result.success for result in results):
+                with self._index_lock:
+                    self._save_data()
+                self._ensure_ann_index()
+        
+        # Storing updates the matrix and indexes and writes files, so keep it off the event loop
+        await asyncio.to_thread(store_all)
+        return results
+    
+    def _detect_change(self, resolved_path: str, force_reprocess: bool) -> Optional[Tuple[os.stat_result, str]]:
+        """
+        Check whether a file needs processing
+        
+        Returns:
+            (stat, content hash) of the file, or None if it is unchanged
+        """
+        # Same size and mtime means unchanged, otherwise fall back to
+        # comparing content hashes
+        stat = Path(resolved_path).stat()
+        metadata = self.file_metadata.get(resolved_path)
+        if not force_reprocess and metadata:
+            if metadata.get('size') == stat.st_size and metadata.get('mtime_ns') == stat.st_mtime_ns:
+                print(f"File {resolved_path} unchanged, skipping...")
+                return None
+        
+        current_hash = self._get_file_hash(resolved_path)
+        if not force_reprocess and metadata:
+            if metadata.get('hash') == current_hash:
+                metadata['size'] = stat.st_size
+                metadata['mtime_ns'] = stat.st_mtime_ns
+                print(f"File {resolved_path} unchanged, skipping...")
+                return None
+        
+        return stat, current_hash
+    
+    def _read_chunks(self, resolved_path: str) -> List[str]:
+        """Read a document as plain text and split it into chunks"""
+        with open(resolved_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Convert markdown to text if needed
+        if resolved_path.endswith('.md'):
+            content = markdown.markdown(content)
+            # Simple HTML tag removal
+            content = _HTML_TAG_RE.sub('', content)
+        
+        return self._chunk_text(content)
+    
+    def _store_document(self, resolved_path: str, chunks: List[str], embeddings: List[np.ndarray],
+                        stat: os.stat_result, current_hash: str, save: bool = True, index: bool = True):
+        """
+        Replace the stored chunks of a file
+        
+        The store is persisted unless save is False, and the HNSW index is
+        built if it is due unless index is False.
+        """
+        with self._index_lock:
             # Remove old embeddings for this file
-            old_chunk_ids = [cid for cid in self.documents 
-                           if self.documents[cid]['file_path'] == resolved_path]
-            for cid in old_chunk_ids:
-                del self.documents[cid]
-                if cid in self.embeddings:
-                    del self.embeddings[cid]
-            
-            # Process each chunk
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{resolved_path}#{i}"
-                
-                # Get embedding
-                embedding = self._get_embedding(chunk)
-                
-                # Store chunk data
-                self.documents[chunk_id] = {
-                    'file_path': resolved_path,
-                    'chunk_index': i,
-                    'content': chunk,
-                    'length': len(chunk)
-                }
-                self.embeddings[chunk_id] = embedding
+            old_chunk_ids = self._file_to_chunks.pop(resolved_path, [])
+            old_contents = [self._contents[self._rows[cid]] for cid in old_chunk_ids if cid in self._rows]
+            self._remove_chunks(old_chunk_ids)
+            
+            # Store chunk data
+            chunk_ids = [f"{resolved_path}#{i}" for i in range(len(chunks))]
+            self._add_chunks(chunk_ids, embeddings, chunks)
+            self._file_to_chunks[resolved_path] = chunk_ids
+            
+            # Pruned only now, so unchanged chunks keep their cached embeddings
+            self._prune_embed_cache(old_contents)
             
             # Update file metadata
             self.file_metadata[resolved_path] = {
                 'hash': current_hash,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
                 'chunk_count': len(chunks),
-                'processed_at': str(Path(resolved_path).stat().st_mtime)
+                'processed_at': str(stat.st_mtime)
             }
             
             # Save data
-            self._save_data()
-            
-            print(f"Processed {resolved_path}: {len(chunks)} chunks")
-            return True
-            
-        except Exception as e:
-            print(f"Error processing {resolved_path}: {e}")
-            return False
+            if save:
+                self._save_data()
+        
+        if index:
+            self._ensure_ann_index()
+        
+        print(f"Processed {resolved_path}: {len(chunks)} chunks")
     
     def search(self, query: str, file_path: Optional[str] = None, file_name: Optional[str] = None, top_k: int = 5) -> List[Dict]:
         """
@@ -248,51 +942,159 @@ class DocumentVectorStore:
         Returns:
             List of relevant chunks with similarity scores
         """
-        if not self.embeddings:
+        # Skip the embedding call when there is nothing to search
+        rows = self._candidate_rows(file_path, file_name)
+        if rows is not None and rows.size == 0:
             return []
         
         # Get query embedding
-        query_embedding = self._get_embedding(query)
+        query_embedding = self.embed_query(query)
         
-        # Filter by file if specified
-        target_file_path = None
-        if file_name or file_path:
-            try:
-                target_file_path = self._resolve_file_path(file_path, file_name)
-            except ValueError:
-                # If file not found, return empty results
-                return []
+        return self.scan_index(query_embedding, file_path, file_name, top_k)
+    
+    def scan_index(self, query_embedding: np.ndarray, file_path: Optional[str] = None,
+                   file_name: Optional[str] = None, top_k: int = 5) -> List[Dict]:
+        """
+        Search for relevant document chunks with an already embedded query
+        
+        This is the compute-only part of search(): it makes no API calls.
+        
+        Args:
+            query_embedding: L2-normalized query embedding
+            file_path: Optional file path to limit search scope (for backward compatibility)
+            file_name: Optional file name to limit search scope (preferred)
+            top_k: Number of top results to return
             
-            candidate_ids = [cid for cid in self.documents 
-                           if self.documents[cid]['file_path'] == target_file_path]
-        else:
-            candidate_ids = list(self.documents.keys())
+        Returns:
+            List of relevant chunks with similarity scores
+        """
+        with self._index_lock:
+            rows = self._candidate_rows(file_path, file_name)
+            if rows is not None and rows.size == 0:
+                return []
+            return self._scan_rows(query_embedding, rows, top_k)
+    
+    def _candidate_rows(self, file_path: Optional[str], file_name: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Matrix rows a search may return
         
-        if not candidate_ids:
-            return []
+        Returns:
+            None to search every row, otherwise the row indices of the
+            requested file (empty if there is nothing to search)
+        """
+        if not self._ids:
+            return np.empty(0, dtype=np.intp)
+        
+        if not (file_name or file_path):
+            return None
+        
+        try:
+            target_file_path = self._resolve_file_path(file_path, file_name)
+        except ValueError:
+            # If file not found, return empty results
+            return np.empty(0, dtype=np.intp)
         
-        # Calculate similarities
-        similarities = []
-        for chunk_id in candidate_ids:
-            if chunk_id in self.embeddings:
-                chunk_embedding = self.embeddings[chunk_id]
-                similarity = cosine_similarity(
-                    [query_embedding], [chunk_embedding]
-                )[0][0]
-                similarities.append((chunk_id, similarity))
+        candidate_ids = self._file_to_chunks.get(target_file_path, [])
+        return np.fromiter(
+            (self._rows[cid] for cid in candidate_ids if cid in self._rows),
+            dtype=np.intp
+        )
+    
+    def _scan_rows(self, query_embedding: np.ndarray, rows: Optional[np.ndarray], top_k: int) -> List[Dict]:
+        """Score candidate rows against the query and return the top_k chunks"""
+        # Large unscoped searches take a candidate shortlist from the
+        # approximate index and score only those rows exactly
+        if rows is None:
+            ann_index = self._get_ann_index()
+            if ann_index is not None:
+                k = min(top_k * ANN_CANDIDATE_FACTOR, len(self._ids))
+                ann_index.set_ef(max(ANN_EF_SEARCH, k))
+                labels, _ = ann_index.knn_query(query_embedding, k=k)
+                rows = labels[0].astype(np.intp)
         
-        # Sort by similarity and return top_k
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Rows and query are unit vectors, so cosine similarity is a plain dot
+        # product computed for all candidates in one matrix-vector product
+        if rows is None:
+            scores = _dot_scores(self._matrix, query_embedding)
+        else:
+            scores = _dot_scores(self._matrix[rows], query_embedding)
         
+        return self._top_results(scores, rows, top_k)
+    
+    def _top_results(self, scores: np.ndarray, rows: Optional[np.ndarray], top_k: int) -> List[Dict]:
+        """Chunk dicts for the top_k scores, where scores[i] belongs to rows[i] (or row i)"""
         results = []
-        for chunk_id, similarity in similarities[:top_k]:
-            chunk_data = self.documents[chunk_id].copy()
-            chunk_data['similarity'] = float(similarity)
-            chunk_data['chunk_id'] = chunk_id
+        for i in _top_k_indices(scores, top_k):
+            chunk_data = self._chunk_data(rows[i] if rows is not None else i)
+            chunk_data['similarity'] = float(scores[i])
             results.append(chunk_data)
         
         return results
     
+    def batch_search(self, queries: List[str], file_path: Optional[str] = None,
+                     file_name: Optional[str] = None, top_k: int = 5) -> List[List[Dict]]:
+        """
+        Search for several queries at once
+        
+        All queries are embedded in one API call and, for exact scans, scored
+        with a single matrix-matrix product.
+        
+        Args:
+            queries: Search queries
+            file_path: Optional file path to limit search scope (for backward compatibility)
+            file_name: Optional file name to limit search scope (preferred)
+            top_k: Number of top results to return per query
+            
+        Returns:
+            One list of relevant chunks with similarity scores per query
+        """
+        if not queries:
+            return []
+        
+        # Skip the embedding call when there is nothing to search
+        rows = self._candidate_rows(file_path, file_name)
+        if rows is not None and rows.size == 0:
+            return [[] for _ in queries]
+        
+        query_matrix = self.embed_queries(queries)
+        
+        return self.batch_scan_index(query_matrix, file_path, file_name, top_k)
+    
+    def batch_scan_index(self, query_embeddings: np.ndarray, file_path: Optional[str] = None,
+                         file_name: Optional[str] = None, top_k: int = 5) -> List[List[Dict]]:
+        """
+        Search for several already embedded queries at once
+        
+        This is the compute-only part of batch_search(): it makes no API calls.
+        
+        Args:
+            query_embeddings: (n_queries, dim) matrix of L2-normalized query embeddings
+            file_path: Optional file path to limit search scope (for backward compatibility)
+            file_name: Optional file name to limit search scope (preferred)
+            top_k: Number of top results to return per query
+            
+        Returns:
+            One list of relevant chunks with similarity scores per query
+        """
+        if len(query_embeddings) == 0:
+            return []
+        
+        with self._index_lock:
+            rows = self._candidate_rows(file_path, file_name)
+            if rows is not None and rows.size == 0:
+                return [[] for _ in query_embeddings]
+            return self._batch_scan_rows(query_embeddings, rows, top_k)
+    
+    def _batch_scan_rows(self, query_matrix: np.ndarray, rows: Optional[np.ndarray], top_k: int) -> List[List[Dict]]:
+        """Score candidate rows against every query and return the top_k chunks per query"""
+        # Unscoped searches answered from the approximate index go one query at a time
+        if rows is None and self._get_ann_index() is not None:
+            return [self._scan_rows(query_embedding, rows, top_k) for query_embedding in query_matrix]
+        
+        matrix = self._matrix if rows is None else self._matrix[rows]
+        scores = query_matrix @ matrix.T
+        return [self._top_results(query_scores, rows, top_k) for query_scores in scores]
+    
     def list_files(self) -> List[Dict]:
         """
         List all files in the vector store
@@ -300,16 +1102,29 @@ class DocumentVectorStore:
         Returns:
             List of file information
         """
-        files = []
-        for file_path, metadata in self.file_metadata.items():
-            files.append({
-                'file_path': file_path,
-                'file_name': Path(file_path).name,
-                'chunk_count': metadata.get('chunk_count', 0),
-                'processed_at': metadata.get('processed_at', ''),
-                'exists': Path(file_path).exists()
-            })
-        return files
+        return [self.get_file_info(file_path) for file_path in list(self.file_metadata)]
+    
+    def get_file_info(self, file_path: str) -> Optional[Dict]:
+        """
+        Get information about one stored file with a direct metadata lookup
+        
+        Args:
+            file_path: Resolved path of the file
+            
+        Returns:
+            File information in the list_files() format, or None if the file
+            is not in the vector store
+        """
+        metadata = self.file_metadata.get(file_path)
+        if metadata is None:
+            return None
+        return {
+            'file_path': file_path,
+            'file_name': Path(file_path).name,
+            'chunk_count': metadata.get('chunk_count', 0),
+            'processed_at': metadata.get('processed_at', ''),
+            'exists': Path(file_path).exists()
+        }
     
     def remove_document(self, file_path: str) -> bool:
         """
@@ -327,20 +1142,19 @@ class DocumentVectorStore:
             return False
         
         try:
-            # Remove all chunks for this file
-            chunk_ids_to_remove = [cid for cid in self.documents 
-                                 if self.documents[cid]['file_path'] == file_path]
-            
-            for chunk_id in chunk_ids_to_remove:
-                del self.documents[chunk_id]
-                if chunk_id in self.embeddings:
-                    del self.embeddings[chunk_id]
-            
-            # Remove file metadata
-            del self.file_metadata[file_path]
-            
-            # Save updated data
-            self._save_data()
+            with self._index_lock:
+                # Remove all chunks for this file
+                chunk_ids_to_remove = self._file_to_chunks.pop(file_path, [])
+                removed_contents = [self._contents[self._rows[cid]] for cid in chunk_ids_to_remove
+                                    if cid in self._rows]
+                self._remove_chunks(chunk_ids_to_remove)
+                self._prune_embed_cache(removed_contents)
+                
+                # Remove file metadata
+                del self.file_metadata[file_path]
+                
+                # Save updated data
+                self._save_data()
             
             print(f"Removed {file_path}: {len(chunk_ids_to_remove)} chunks deleted")
             return True
@@ -356,12 +1170,14 @@ class DocumentVectorStore:
         Returns:
             Dictionary with vector store statistics
         """
-        total_chunks = len(self.documents)
-        total_files = len(self.file_metadata)
+        # Snapshot, since documents are stored and removed in worker threads
+        files = list(self.file_metadata.items())
+        total_chunks = len(self._ids)
+        total_files = len(files)
         
         # Calculate file size distribution
         file_stats = []
-        for file_path, metadata in self.file_metadata.items():
+        for file_path, metadata in files:
             file_stats.append({
                 'file_path': file_path,
                 'chunk_count': metadata.get('chunk_count', 0),
@@ -373,91 +1189,213 @@ class DocumentVectorStore:
             'total_chunks': total_chunks,
             'avg_chunks_per_file': total_chunks / total_files if total_files > 0 else 0,
             'files': file_stats,
-            'storage_size_mb': self._get_storage_size()
+            'storage_size_mb': self._get_storage_size(),
+            'query_cache': self.query_cache_stats()
         }
     
     def _get_storage_size(self) -> float:
         """Get total storage size in MB"""
         total_size = 0
         for file_path in [
-            self.storage_dir / "embeddings.npz",
-            self.storage_dir / "documents.json", 
-            self.storage_dir / "file_metadata.json"
+            self.storage_dir / "embeddings.npy",
+            self.storage_dir / "embedding_ids.json",
+            self.storage_dir / "contents.jsonl",
+            self.storage_dir / "file_metadata.json",
+            self.storage_dir / "embed_cache.npy",
+            self.storage_dir / "embed_cache_keys.json",
+            self.storage_dir / "hnsw.bin",
+            self.storage_dir / "bm25.json"
         ]:
             if file_path.exists():
                 total_size += file_path.stat().st_size
         return round(total_size / (1024 * 1024), 2)
     
-    def rerank_results(self, results: List[Dict], query: str) -> List[Dict]:
+    def rerank_results(self, results: List[Dict], query: str, top_k: Optional[int] = None) -> List[Dict]:
         """
         Rerank search results using additional scoring factors
         
         Args:
             results: Initial search results
             query: Original query
+            top_k: Keep only this many best results (all when None)
             
         Returns:
             Reranked results
         """
-        # Add keyword matching score
-        query_words = set(query.lower().split())
+        if not results:
+            return results
         
-        for result in results:
-            content_words = set(result['content'].lower().split())
-            keyword_overlap = len(query_words.intersection(content_words))
-            keyword_score = keyword_overlap / len(query_words) if query_words else 0
-            
-            # Combine semantic similarity with keyword matching
-            combined_score = 0.7 * result['similarity'] + 0.3 * keyword_score
+        # Add keyword matching score: BM25 from the inverted index, scaled
+        # so the best candidate scores 1
+        with self._index_lock:
+            bm25_scores = self._bm25.scores(query, [result['chunk_id'] for result in results])
+        best = bm25_scores.max()
+        keyword_scores = bm25_scores / best if best > 0 else bm25_scores
+        
+        # Combine semantic similarity with keyword matching
+        similarities = np.fromiter(
+            (result['similarity'] for result in results), dtype=np.float64, count=len(results)
+        )
+        combined_scores = 0.7 * similarities + 0.3 * keyword_scores
+        
+        for result, combined_score, keyword_score in zip(results, combined_scores.tolist(), keyword_scores.tolist()):
             result['combined_score'] = combined_score
             result['keyword_score'] = keyword_score
         
-        # Sort by combined score
-        results.sort(key=lambda x: x.get('combined_score', x['similarity']), reverse=True)
+        # Sort by combined score, partially when only the best top_k are kept
+        if top_k is None:
+            order = np.argsort(-combined_scores, kind='stable')
+        else:
+            order = _top_k_indices(combined_scores, top_k)
+        results[:] = [results[i] for i in order]
         return results
     
     def _save_data(self):
         """Save vector store data to disk"""
         try:
-            # Save embeddings
-            embeddings_file = self.storage_dir / "embeddings.npz"
-            if self.embeddings:
-                embedding_arrays = {k: v for k, v in self.embeddings.items()}
-                np.savez_compressed(embeddings_file, **embedding_arrays)
+            # Save embeddings as a single matrix plus its row ids, then map
+            # the new file so the page cache rather than the heap holds it
+            embeddings_file = self.storage_dir / "embeddings.npy"
+            _save_array(embeddings_file, self._matrix.astype(np.float32, copy=False))
+            self._matrix = np.load(embeddings_file, mmap_mode='r')
             
-            # Save documents metadata
-            docs_file = self.storage_dir / "documents.json"
-            with open(docs_file, 'w', encoding='utf-8') as f:
-                json.dump(self.documents, f, ensure_ascii=False, indent=2)
+            ids_file = self.storage_dir / "embedding_ids.json"
+            _write_json(ids_file, self._ids, indent=False)
+            
+            # Save the approximate index, or drop a stale one
+            ann_file = self.storage_dir / "hnsw.bin"
+            if self._ann_index is not None:
+                self._ann_index.save_index(str(ann_file))
+            elif ann_file.exists():
+                ann_file.unlink()
+            
+            # Save chunk texts, one JSON string per line in row order
+            contents_file = self.storage_dir / "contents.jsonl"
+            _write_json_lines(contents_file, self._contents)
+            
+            # Save the keyword index
+            _write_json(self.storage_dir / "bm25.json", self._bm25.to_dict(), indent=False)
             
             # Save file metadata
             metadata_file = self.storage_dir / "file_metadata.json"
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.file_metadata, f, ensure_ascii=False, indent=2)
+            _write_json(metadata_file, self.file_metadata)
+            
+            # Save embedding cache
+            if self._embed_cache_dirty:
+                self._save_embed_cache()
                 
         except Exception as e:
             print(f"Error saving vector store data: {e}")
     
+    def _save_embed_cache(self):
+        """Save the embedding cache as a key list plus one matrix, then map the matrix"""
+        cache_file = self.storage_dir / "embed_cache.npy"
+        keys_file = self.storage_dir / "embed_cache_keys.json"
+        self._embed_cache_dirty = False
+        
+        # Snapshot, since ingest may add entries from the event loop meanwhile
+        entries = list(self._embed_cache.items())
+        if entries:
+            keys = [key for key, _ in entries]
+            _save_array(cache_file, np.vstack([embedding for _, embedding in entries]).astype(np.float32, copy=False))
+            _write_json(keys_file, keys, indent=False)
+            matrix = np.load(cache_file, mmap_mode='r')
+            for row, key in enumerate(keys):
+                if key in self._embed_cache:
+                    self._embed_cache[key] = matrix[row]
+        else:
+            for stale_file in (cache_file, keys_file):
+                if stale_file.exists():
+                    stale_file.unlink()
+        
+        # Stores written before embed_cache.npy existed used a compressed npz
+        legacy_file = self.storage_dir / "embed_cache.npz"
+        if legacy_file.exists():
+            legacy_file.unlink()
+    
+    def _load_bm25(self):
+        """Load the saved keyword index, rebuilding it if it does not match the chunks"""
+        bm25_file = self.storage_dir / "bm25.json"
+        if bm25_file.exists():
+            index = BM25Index.from_dict(_read_json(bm25_file))
+            if len(index) == len(self._ids) and all(cid in index for cid in self._ids):
+                self._bm25 = index
+                return
+        
+        self._bm25 = BM25Index()
+        for cid, content in zip(self._ids, self._contents):
+            self._bm25.add(cid, content)
+    
     def _load_data(self):
         """Load vector store data from disk"""
         try:
-            # Load embeddings
-            embeddings_file = self.storage_dir / "embeddings.npz"
-            if embeddings_file.exists():
-                data = np.load(embeddings_file)
-                self.embeddings = {key: data[key] for key in data.files}
-            
-            # Load documents metadata
+            # Stores written before contents.jsonl existed keep chunk
+            # texts in documents.json, keyed by chunk id
+            contents_file = self.storage_dir / "contents.jsonl"
             docs_file = self.storage_dir / "documents.json"
-            if docs_file.exists():
-                with open(docs_file, 'r', encoding='utf-8') as f:
-                    self.documents = json.load(f)
+            legacy_documents = {}
+            if not contents_file.exists() and docs_file.exists():
+                legacy_documents = _read_json(docs_file)
+            
+            def legacy_contents(chunk_ids):
+                return [legacy_documents.get(cid, {}).get('content', '') for cid in chunk_ids]
+            
+            # Load embeddings, memory-mapped so the OS page cache serves reads
+            embeddings_file = self.storage_dir / "embeddings.npy"
+            ids_file = self.storage_dir / "embedding_ids.json"
+            legacy_file = self.storage_dir / "embeddings.npz"
+            if embeddings_file.exists() and ids_file.exists():
+                self._ids = _read_json(ids_file)
+                self._matrix = np.load(embeddings_file, mmap_mode='r')
+                if contents_file.exists():
+                    self._contents = _read_json_lines(contents_file)
+                else:
+                    self._contents = legacy_contents(self._ids)
+                self._rows = {cid: row for row, cid in enumerate(self._ids)}
+                self._extend_display_fields(self._ids, self._contents)
+                self._load_bm25()
+            elif legacy_file.exists():
+                # Older stores kept one npz entry per chunk id
+                data = np.load(legacy_file)
+                self._add_chunks(
+                    list(data.files),
+                    [_normalize(data[key]) for key in data.files],
+                    legacy_contents(data.files)
+                )
+            
+            # Load the approximate index if it matches the stored rows
+            ann_file = self.storage_dir / "hnsw.bin"
+            if hnswlib is not None and ann_file.exists() and self._ids:
+                try:
+                    index = hnswlib.Index(space='ip', dim=self._matrix.shape[1])
+                    index.load_index(str(ann_file), max_elements=len(self._ids))
+                    # Labels past the last row belong to removed rows and are marked deleted
+                    if index.get_current_count() >= len(self._ids):
+                        index.set_ef(ANN_EF_SEARCH)
+                        self._ann_index = index
+                except Exception as e:
+                    print(f"Ignoring unreadable HNSW index: {e}")
+            
+            self._file_to_chunks = defaultdict(list)
+            for chunk_id in self._ids:
+                self._file_to_chunks[chunk_id.rsplit('#', 1)[0]].append(chunk_id)
             
             # Load file metadata
             metadata_file = self.storage_dir / "file_metadata.json"
             if metadata_file.exists():
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    self.file_metadata = json.load(f)
+                self.file_metadata = _read_json(metadata_file)
+            
+            # Load embedding cache, memory-mapped like the embeddings
+            cache_file = self.storage_dir / "embed_cache.npy"
+            keys_file = self.storage_dir / "embed_cache_keys.json"
+            legacy_cache_file = self.storage_dir / "embed_cache.npz"
+            if cache_file.exists() and keys_file.exists():
+                matrix = np.load(cache_file, mmap_mode='r')
+                self._embed_cache = {key: matrix[row] for row, key in enumerate(_read_json(keys_file))}
+            elif legacy_cache_file.exists():
+                data = np.load(legacy_cache_file)
+                self._embed_cache = {key: _normalize(data[key]) for key in data.files}
+                self._embed_cache_dirty = True
                     
         except Exception as e:
             print(f"Error loading vector store data: {e}")
@@ -1,7 +1,7 @@
 """
 Pydantic models for the Gugugu API
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 
@@ -26,6 +26,13 @@ class AIResponse(BaseModel):
     usage: Optional[dict] = None
 
 
+class AIBatchResult(BaseModel):
+    """Result of one request in a batch chat call"""
+    success: bool
+    result: Optional[AIResponse] = None
+    error: Optional[str] = None
+
+
 class RAGRequest(BaseModel):
     """Request model for RAG chat endpoints"""
     message: str
@@ -34,6 +41,7 @@ class RAGRequest(BaseModel):
     max_tokens: Optional[int] = 1000
     temperature: Optional[float] = 0.7
     top_k: Optional[int] = 5  # 检索的相关片段数量
+    retrieval_budget: Optional[int] = Field(3000, ge=0)  # 提示词中文档内容的最大字符数，None表示不限制
 
 
 class RAGResponse(BaseModel):
@@ -3,16 +3,26 @@ AI-related endpoints for the Gugugu API
 """
 import os
 import json
+import asyncio
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from contextlib import asynccontextmanager
 from api.models.schemas import (
-    AIRequest, AIStreamRequest, AIResponse, AIHealthResponse,
+    AIRequest, AIStreamRequest, AIResponse, AIBatchResult, AIHealthResponse,
     RAGRequest, RAGResponse, DocumentListResponse, DocumentInfo,
     DocumentProcessRequest, DocumentProcessResponse
 )
-from api.core.config import get_ai_client, get_ai_model
+from api.core.config import get_ai_client, get_ai_model, get_api_base
 from api.core.vector_store import vector_store
+from api.core.semantic_cache import semantic_cache
+from api.core.response_cache import response_cache
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
 
 router = APIRouter(
     prefix="/ai",
@@ -21,6 +31,203 @@ router = APIRouter(
 )
 
 
+def _sse(event: dict) -> bytes:
+    """Encode event as a server-sent events data frame"""
+    if orjson is not None:
+        return b"data: " + orjson.dumps(event) + b"\n\n"
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+# Maximum number of requests accepted by /chat/batch
+MAX_CHAT_BATCH = 50
+
+# Maximum number of AI service calls in flight; further calls wait for a slot
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "32"))
+
+# Seconds an AI service call may wait for a slot, and then may take
+AI_CALL_TIMEOUT = float(os.getenv("AI_CALL_TIMEOUT", "120"))
+
+AI_BUSY_MESSAGE = "AI服务繁忙或响应超时，请稍后重试"
+
+_ai_semaphore = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+
+# Seconds between background AI service health checks
+AI_HEALTH_INTERVAL = float(os.getenv("AI_HEALTH_INTERVAL", "30"))
+
+# Seconds the semantic cache may spend embedding a message; on timeout the
+# request goes on uncached, so a slow embedding service cannot stall chat
+SEMANTIC_CACHE_LOOKUP_TIMEOUT = float(os.getenv("SEMANTIC_CACHE_LOOKUP_TIMEOUT", "1.0"))
+
+# Latest AI service health check result, served by /health
+_ai_health: Optional[AIHealthResponse] = None
+
+# Display name and system prompt for each document game type
+GAME_PROMPTS = {
+    'splendor': ("璀璨宝石（Splendor）", "你是璀璨宝石（Splendor）桌游的专业助手，精通游戏规则和策略。"),
+    'catan': ("卡坦岛（Catan）", "你是卡坦岛（Catan）桌游的专业助手，精通游戏规则和策略。"),
+    'generic': ("通用", "你是桌游专家助手，精通各种桌游规则和策略。"),
+}
+
+# Characters that end a sentence, where an over-budget chunk may be cut
+_SENTENCE_ENDS = ("。", "！", "？", ".", "!", "?", "\n")
+
+
+def _fit_context(results: List[dict], budget: Optional[int]) -> List[Tuple[dict, str]]:
+    """
+    Select search results whose contents fit in a character budget
+    
+    The chunk that crosses the budget is cut at its last sentence end that
+    still fits, or at the budget itself when no sentence end fits; later
+    chunks are dropped.
+    
+    Args:
+        results: Search results, best first
+        budget: Maximum total characters of content, None for no limit
+        
+    Returns:
+        (result, content to put in the prompt) pairs, in result order
+    """
+    if budget is None:
+        return [(result, result['content']) for result in results]
+    
+    selected = []
+    used = 0
+    for result in results:
+        content = result['content']
+        remaining = budget - used
+        if len(content) <= remaining:
+            selected.append((result, content))
+            used += len(content)
+            continue
+        
+        cut = max(content.rfind(mark, 0, remaining) for mark in _SENTENCE_ENDS)
+        end = cut + 1 if cut > 0 else remaining
+        if end > 0:
+            selected.append((result, content[:end]))
+        break
+    
+    return selected
+
+
+@asynccontextmanager
+async def _ai_slot():
+    """
+    Hold one of the AI_MAX_CONCURRENCY AI service call slots
+    
+    Raises:
+        asyncio.TimeoutError: If no slot frees up within AI_CALL_TIMEOUT
+    """
+    await asyncio.wait_for(_ai_semaphore.acquire(), AI_CALL_TIMEOUT)
+    try:
+        yield
+    finally:
+        _ai_semaphore.release()
+
+
+async def _create_completion(**kwargs):
+    """
+    Call the AI chat completion API with bounded concurrency
+    
+    When AI_MAX_CONCURRENCY calls are already in flight the call queues, so
+    a slow AI service cannot pile up unbounded pending requests.
+    
+    Args:
+        **kwargs: Arguments for chat.completions.create
+        
+    Returns:
+        The chat completion
+        
+    Raises:
+        asyncio.TimeoutError: If no slot frees up or the call does not finish
+            within AI_CALL_TIMEOUT
+    """
+    async with _ai_slot():
+        return await asyncio.wait_for(get_ai_client().chat.completions.create(**kwargs), AI_CALL_TIMEOUT)
+
+
+def _ai_error(e: Exception) -> str:
+    """Describe an AI service call failure"""
+    return AI_BUSY_MESSAGE if isinstance(e, asyncio.TimeoutError) else str(e)
+
+
+async def _semantic_cache_lookup(namespace: str, message: str) -> Tuple[Optional[np.ndarray], Optional[Any]]:
+    """
+    Look up a cached response for a semantically similar message
+    
+    Returns:
+        (message embedding or None if embedding failed or timed out, cached response or None)
+    """
+    try:
+        embedding = await asyncio.wait_for(
+            vector_store.embed_query_async(message, fallback=False), SEMANTIC_CACHE_LOOKUP_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        return None, None
+    if embedding is None:
+        return None, None
+    return embedding, semantic_cache.lookup(namespace, embedding)
+
+
+def _is_cacheable(request: AIRequest) -> bool:
+    """Whether a chat answer may be cached: only temperature 0 asks for a reproducible answer"""
+    return request.temperature == 0
+
+
+async def _complete_chat(request: AIRequest, semantic_lookup: bool = True) -> AIResponse:
+    """
+    Answer a chat request from the response caches or the AI service
+    
+    Only requests with temperature 0 use the caches; at any other temperature
+    asking again is expected to produce a new answer.
+    
+    Args:
+        request: Chat request
+        semantic_lookup: Whether to embed the message for the semantic cache;
+            False skips it, e.g. when the embedding service just failed
+        
+    Returns:
+        AIResponse for the request
+    """
+    model = get_ai_model()
+    cacheable = _is_cacheable(request)
+    if not cacheable:
+        semantic_lookup = False
+    
+    # Identical requests are answered without even embedding the message
+    cache_key = (model, request.message, request.max_tokens, request.temperature)
+    cached = response_cache.get(cache_key) if cacheable else None
+    if cached is not None:
+        return cached
+    
+    namespace = f"chat:{request.max_tokens}:{request.temperature}"
+    embedding, cached = None, None
+    if semantic_lookup:
+        embedding, cached = await _semantic_cache_lookup(namespace, request.message)
+    if cached is not None:
+        response_cache.put(cache_key, cached)
+        return cached
+    
+    response = await _create_completion(
+        model=model,
+        messages=[
+            {"role": "user", "content": request.message}
+        ],
+        max_tokens=request.max_tokens,
+        temperature=request.temperature
+    )
+    
+    result = AIResponse(
+        response=response.choices[0].message.content,
+        model=model,
+        usage=response.usage.model_dump() if response.usage else None
+    )
+    if cacheable:
+        response_cache.put(cache_key, result)
+    if embedding is not None:
+        semantic_cache.store(namespace, embedding, result)
+    return result
+
+
 @router.post("/chat", response_model=AIResponse)
 async def chat_with_ai(request: AIRequest):
     """
@@ -36,42 +243,120 @@ async def chat_with_ai(request: AIRequest):
         HTTPException: 500 if AI service call fails
     """
     try:
-        client = get_ai_client()
-        model = get_ai_model()
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "user", "content": request.message}
-            ],
-            max_tokens=request.max_tokens,
-            temperature=request.temperature
-        )
-        
-        return AIResponse(
-            response=response.choices[0].message.content,
-            model=model,
-            usage=response.usage.dict() if response.usage else None
-        )
+        return await _complete_chat(request)
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=AI_BUSY_MESSAGE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI服务调用失败: {str(e)}")
 
 
+@router.post("/chat/batch", response_model=List[AIBatchResult])
+async def chat_with_ai_batch(request: List[AIRequest]):
+    """
+    Chat with AI model for several messages in one call
+    
+    Requests run concurrently, and identical requests in the batch share a
+    single AI service call.
+    
+    Args:
+        request (List[AIRequest]): Chat requests, at most MAX_CHAT_BATCH
+        
+    Returns:
+        List[AIBatchResult]: One result per request, in request order
+        
+    Raises:
+        HTTPException: 400 if the batch is larger than MAX_CHAT_BATCH
+    """
+    if len(request) > MAX_CHAT_BATCH:
+        raise HTTPException(status_code=400, detail=f"单次最多提交 {MAX_CHAT_BATCH} 个对话请求")
+    
+    unique = {}
+    for chat_request in request:
+        unique.setdefault((chat_request.message, chat_request.max_tokens, chat_request.temperature), chat_request)
+    
+    # Embed the distinct messages that miss the exact-match cache with one
+    # API call, so the semantic cache lookups below find them in the query
+    # embedding cache. If that call fails or times out, the semantic cache is
+    # skipped rather than retried once per request.
+    model = get_ai_model()
+    messages = list(dict.fromkeys(
+        key[0] for key, chat_request in unique.items()
+        if _is_cacheable(chat_request) and (model, *key) not in response_cache
+    ))
+    semantic_lookup = True
+    if messages:
+        try:
+            embeddings = await asyncio.wait_for(
+                vector_store.embed_queries_async(messages, fallback=False), SEMANTIC_CACHE_LOOKUP_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            embeddings = None
+        semantic_lookup = embeddings is not None
+    
+    responses = await asyncio.gather(
+        *(_complete_chat(chat_request, semantic_lookup) for chat_request in unique.values()),
+        return_exceptions=True
+    )
+    results = {}
+    for key, response in zip(unique, responses):
+        if isinstance(response, Exception):
+            results[key] = AIBatchResult(success=False, error=f"AI服务调用失败: {_ai_error(response)}")
+        else:
+            results[key] = AIBatchResult(success=True, result=response)
+    
+    return [
+        results[(chat_request.message, chat_request.max_tokens, chat_request.temperature)]
+        for chat_request in request
+    ]
+
+
+@router.post("/cache/clear")
+async def clear_response_caches():
+    """
+    Drop all cached AI responses
+    
+    Returns:
+        dict: Success message
+    """
+    response_cache.clear()
+    semantic_cache.invalidate()
+    return {"success": True, "message": "AI回答缓存已清空"}
+
+
 @router.get("/health", response_model=AIHealthResponse)
 async def ai_health_check():
     """
     Check AI service connection status
     
+    Serves the latest result of the background check started by
+    refresh_ai_health, so probes do not each cost an AI service call. Checks
+    directly only until the first background result is available.
+    
     Returns:
         AIHealthResponse: Status of AI service with test response
     """
+    global _ai_health
+    if _ai_health is None:
+        _ai_health = await _check_ai_health()
+    return _ai_health
+
+
+async def refresh_ai_health():
+    """Re-check the AI service every AI_HEALTH_INTERVAL seconds until cancelled"""
+    global _ai_health
+    while True:
+        _ai_health = await _check_ai_health()
+        await asyncio.sleep(AI_HEALTH_INTERVAL)
+
+
+async def _check_ai_health() -> AIHealthResponse:
+    """Send a small test request to the AI service and report its status"""
     try:
-        client = get_ai_client()
         model = get_ai_model()
         
         # Send a simple test request
-        response = client.chat.completions.create(
+        response = await _create_completion(
             model=model,
             messages=[{"role": "user", "content": "Hello"}],
             max_tokens=10
@@ -80,16 +365,16 @@ async def ai_health_check():
         return AIHealthResponse(
             status="healthy",
             model=model,
-            api_base=os.getenv("OPENAI_API_BASE"),
+            api_base=get_api_base(),
             test_response=response.choices[0].message.content
         )
         
     except Exception as e:
         return AIHealthResponse(
             status="unhealthy",
-            error=str(e),
+            error=_ai_error(e),
             model=get_ai_model(),
-            api_base=os.getenv("OPENAI_API_BASE")
+            api_base=get_api_base()
         )
 
 
@@ -111,41 +396,46 @@ async def chat_with_ai_stream(request: AIStreamRequest):
         client = get_ai_client()
         model = get_ai_model()
         
-        def generate_stream():
+        async def generate_stream():
             try:
-                stream = client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "user", "content": request.message}
-                    ],
-                    max_tokens=request.max_tokens,
-                    temperature=request.temperature,
-                    stream=True
-                )
-                
-                # Send initial event with metadata
-                yield f"data: {json.dumps({'type': 'start', 'model': model})}\n\n"
-                
-                # Stream the response chunks
-                for chunk in stream:
-                    if hasattr(chunk, 'choices') and len(chunk.choices) > 0:
-                        delta = chunk.choices[0].delta
-                        if hasattr(delta, 'content') and delta.content:
-                            chunk_data = {
-                                'type': 'content',
-                                'content': delta.content
-                            }
-                            yield f"data: {json.dumps(chunk_data)}\n\n"
-                
-                # Send completion event
-                yield f"data: {json.dumps({'type': 'done'})}\n\n"
-                
+                # The slot is held until the stream ends; only waiting for it
+                # and opening the stream are bounded by AI_CALL_TIMEOUT
+                async with _ai_slot():
+                    stream = await asyncio.wait_for(client.chat.completions.create(
+                        model=model,
+                        messages=[
+                            {"role": "user", "content": request.message}
+                        ],
+                        max_tokens=request.max_tokens,
+                        temperature=request.temperature,
+                        stream=True
+                    ), AI_CALL_TIMEOUT)
+                    
+                    # Send initial event with metadata
+                    yield _sse({'type': 'start', 'model': model})
+                    
+                    # Stream the response chunks; the context manager returns the
+                    # upstream connection to the pool even if the client disconnects
+                    async with stream:
+                        async for chunk in stream:
+                            if hasattr(chunk, 'choices') and len(chunk.choices) > 0:
+                                delta = chunk.choices[0].delta
+                                if hasattr(delta, 'content') and delta.content:
+                                    chunk_data = {
+                                        'type': 'content',
+                                        'content': delta.content
+                                    }
+                                    yield _sse(chunk_data)
+                    
+                    # Send completion event
+                    yield _sse({'type': 'done'})
+            
             except Exception as e:
                 error_data = {
                     'type': 'error',
-                    'error': f"AI服务调用失败: {str(e)}"
+                    'error': f"AI服务调用失败: {_ai_error(e)}"
                 }
-                yield f"data: {json.dumps(error_data)}\n\n"
+                yield _sse(error_data)
         
         return StreamingResponse(
             generate_stream(),
@@ -153,6 +443,8 @@ async def chat_with_ai_stream(request: AIStreamRequest):
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
+                # Stop nginx-style proxies from buffering the stream
+                "X-Accel-Buffering": "no",
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Headers": "*",
             }
@@ -177,27 +469,41 @@ async def chat_with_rag(request: RAGRequest):
         HTTPException: 500 if AI service call fails
     """
     try:
-        # Search for relevant document chunks (support both file_name and file_path)
-        search_results = vector_store.search(
-            query=request.message,
+        namespace = (f"rag:{request.file_name}:{request.file_path}:{request.top_k}:"
+                     f"{request.retrieval_budget}:{request.max_tokens}:{request.temperature}")
+        embedding, cached = await _semantic_cache_lookup(namespace, request.message)
+        if cached is not None:
+            return cached
+        
+        # Without a real message embedding the search falls back to a development
+        # embedding, which must never be stored in the semantic cache
+        search_embedding = embedding
+        if search_embedding is None:
+            search_embedding = await vector_store.embed_query_async(request.message)
+        
+        # Search for relevant document chunks (support both file_name and file_path);
+        # the scan runs in a worker thread so it does not block the event loop
+        search_results = await asyncio.to_thread(
+            vector_store.scan_index,
+            search_embedding,
             file_path=request.file_path,
             file_name=request.file_name,
             top_k=request.top_k
         )
         
-        # Build context from search results
-        context_parts = []
-        sources = []
-        
-        for result in search_results:
-            context_parts.append(f"文档片段：{result['content']}")
-            sources.append({
+        # Build context from the search results that fit the retrieval budget
+        fitted = _fit_context(search_results, request.retrieval_budget)
+        context_parts = [f"文档片段：{content}" for _, content in fitted]
+        sources = [
+            {
                 'file_path': result['file_path'],
-                'file_name': os.path.basename(result['file_path']),
+                'file_name': result['file_name'],
                 'chunk_index': result['chunk_index'],
                 'similarity': result['similarity'],
-                'content_preview': result['content'][:200] + "..." if len(result['content']) > 200 else result['content']
-            })
+                'content_preview': result['content_preview']
+            }
+            for result, _ in fitted
+        ]
         
         # Prepare the prompt with context
         if context_parts:
@@ -214,10 +520,9 @@ async def chat_with_rag(request: RAGRequest):
             prompt = f"没有找到相关文档内容。请基于你的知识回答用户问题：{request.message}"
         
         # Call AI model
-        client = get_ai_client()
         model = get_ai_model()
         
-        response = client.chat.completions.create(
+        response = await _create_completion(
             model=model,
             messages=[
                 {"role": "user", "content": prompt}
@@ -226,13 +531,18 @@ async def chat_with_rag(request: RAGRequest):
             temperature=request.temperature
         )
         
-        return RAGResponse(
+        result = RAGResponse(
             response=response.choices[0].message.content,
             model=model,
             sources=sources,
-            usage=response.usage.dict() if response.usage else None
+            usage=response.usage.model_dump() if response.usage else None
         )
+        if embedding is not None:
+            semantic_cache.store(namespace, embedding, result)
+        return result
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=AI_BUSY_MESSAGE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RAG服务调用失败: {str(e)}")
 
@@ -278,35 +588,27 @@ async def process_document(request: DocumentProcessRequest):
             raise HTTPException(status_code=400, detail="必须提供 file_path 或 file_name 参数")
         
         # Process the document
-        success = vector_store.add_document(
+        result = await vector_store.add_document_async(
             file_path=request.file_path,
             file_name=request.file_name,
             force_reprocess=request.force_reprocess
         )
         
-        if success:
-            # Get the resolved file path for response
-            resolved_path = vector_store._resolve_file_path(request.file_path, request.file_name)
-            
-            # Get chunk count
-            files = vector_store.list_files()
-            chunk_count = next(
-                (f['chunk_count'] for f in files if f['file_path'] == resolved_path),
-                0
-            )
+        if result.success:
+            # Cached RAG answers may be based on the old document content
+            semantic_cache.invalidate("rag")
             
             return DocumentProcessResponse(
                 success=True,
-                message=f"文档处理成功，生成了 {chunk_count} 个文档片段",
-                file_path=resolved_path,
-                chunk_count=chunk_count
+                message=f"文档处理成功，生成了 {result.chunk_count} 个文档片段",
+                file_path=result.resolved_path,
+                chunk_count=result.chunk_count
             )
         else:
-            resolved_path = vector_store._resolve_file_path(request.file_path, request.file_name)
             return DocumentProcessResponse(
                 success=False,
                 message="文档未发生变化，跳过处理",
-                file_path=resolved_path
+                file_path=result.resolved_path
             )
             
     except ValueError as e:
@@ -325,31 +627,23 @@ async def process_splendor_document():
     """
     try:
         # Process using file name (much cleaner!)
-        success = vector_store.add_document(file_name="splendor.md", force_reprocess=True)
+        result = await vector_store.add_document_async(file_name="splendor.md", force_reprocess=True)
         
-        if success:
-            # Get the resolved path for metadata
-            resolved_path = vector_store._resolve_file_path(file_name="splendor.md")
-            
-            # Get chunk count
-            files = vector_store.list_files()
-            chunk_count = next(
-                (f['chunk_count'] for f in files if f['file_path'] == resolved_path),
-                0
-            )
+        if result.success:
+            # Cached RAG answers may be based on the old document content
+            semantic_cache.invalidate("rag")
             
             return DocumentProcessResponse(
                 success=True,
-                message=f"璀璨宝石规则文档处理成功，生成了 {chunk_count} 个文档片段",
-                file_path=resolved_path,
-                chunk_count=chunk_count
+                message=f"璀璨宝石规则文档处理成功，生成了 {result.chunk_count} 个文档片段",
+                file_path=result.resolved_path,
+                chunk_count=result.chunk_count
             )
         else:
-            resolved_path = vector_store._resolve_file_path(file_name="splendor.md")
             return DocumentProcessResponse(
                 success=False,
                 message="璀璨宝石规则文档处理失败",
-                file_path=resolved_path
+                file_path=result.resolved_path
             )
             
     except ValueError as e:
@@ -368,31 +662,23 @@ async def process_catan_document():
     """
     try:
         # Process using file name (much cleaner!)
-        success = vector_store.add_document(file_name="catan.md", force_reprocess=True)
+        result = await vector_store.add_document_async(file_name="catan.md", force_reprocess=True)
         
-        if success:
-            # Get the resolved path for metadata
-            resolved_path = vector_store._resolve_file_path(file_name="catan.md")
-            
-            # Get chunk count
-            files = vector_store.list_files()
-            chunk_count = next(
-                (f['chunk_count'] for f in files if f['file_path'] == resolved_path),
-                0
-            )
+        if result.success:
+            # Cached RAG answers may be based on the old document content
+            semantic_cache.invalidate("rag")
             
             return DocumentProcessResponse(
                 success=True,
-                message=f"卡坦岛规则文档处理成功，生成了 {chunk_count} 个文档片段",
-                file_path=resolved_path,
-                chunk_count=chunk_count
+                message=f"卡坦岛规则文档处理成功，生成了 {result.chunk_count} 个文档片段",
+                file_path=result.resolved_path,
+                chunk_count=result.chunk_count
             )
         else:
-            resolved_path = vector_store._resolve_file_path(file_name="catan.md")
             return DocumentProcessResponse(
                 success=False,
                 message="卡坦岛规则文档处理失败",
-                file_path=resolved_path
+                file_path=result.resolved_path
             )
             
     except ValueError as e:
@@ -412,66 +698,69 @@ async def process_documents_batch(request: List[DocumentProcessRequest]):
     Returns:
         List[DocumentProcessResponse]: List of processing results
     """
-    results = []
+    results: List[Optional[DocumentProcessResponse]] = [None] * len(request)
+    documents = []
+    positions = []
     
-    for doc_request in request:
-        try:
-            # Validate request
-            if not doc_request.file_path and not doc_request.file_name:
-                results.append(DocumentProcessResponse(
-                    success=False,
-                    message="必须提供 file_path 或 file_name 参数",
-                    file_path="unknown"
-                ))
-                continue
-            
-            # Process the document
-            success = vector_store.add_document(
-                file_path=doc_request.file_path,
-                file_name=doc_request.file_name,
-                force_reprocess=doc_request.force_reprocess
+    # Resolve every file first so the valid ones can be processed together
+    for i, doc_request in enumerate(request):
+        # Validate request
+        if not doc_request.file_path and not doc_request.file_name:
+            results[i] = DocumentProcessResponse(
+                success=False,
+                message="必须提供 file_path 或 file_name 参数",
+                file_path="unknown"
             )
-            
-            # Get the resolved file path for response
+            continue
+        
+        try:
             resolved_path = vector_store._resolve_file_path(doc_request.file_path, doc_request.file_name)
-            
-            if success:
-                # Get chunk count
-                files = vector_store.list_files()
-                chunk_count = next(
-                    (f['chunk_count'] for f in files if f['file_path'] == resolved_path),
-                    0
-                )
-                
-                results.append(DocumentProcessResponse(
-                    success=True,
-                    message=f"文档处理成功，生成了 {chunk_count} 个文档片段",
-                    file_path=resolved_path,
-                    chunk_count=chunk_count
-                ))
-            else:
-                results.append(DocumentProcessResponse(
-                    success=False,
-                    message="文档未发生变化，跳过处理",
-                    file_path=resolved_path
-                ))
-                
         except ValueError as e:
             # File not found or validation error
             file_identifier = doc_request.file_name or doc_request.file_path or "unknown"
-            results.append(DocumentProcessResponse(
+            results[i] = DocumentProcessResponse(
                 success=False,
                 message=str(e),
                 file_path=file_identifier
-            ))
-        except Exception as e:
-            # Other processing errors
+            )
+            continue
+        
+        documents.append((resolved_path, doc_request.force_reprocess))
+        positions.append(i)
+    
+    try:
+        # Process the documents, embedding all their chunks together
+        processed = await vector_store.add_documents_async(documents)
+    except Exception as e:
+        # Other processing errors
+        for i in positions:
+            doc_request = request[i]
             file_identifier = doc_request.file_name or doc_request.file_path or "unknown"
-            results.append(DocumentProcessResponse(
+            results[i] = DocumentProcessResponse(
                 success=False,
                 message=f"文档处理失败: {str(e)}",
                 file_path=file_identifier
-            ))
+            )
+        return results
+    
+    if any(result.success for result in processed):
+        # Cached RAG answers may be based on the old document content
+        semantic_cache.invalidate("rag")
+    
+    for i, result in zip(positions, processed):
+        if result.success:
+            results[i] = DocumentProcessResponse(
+                success=True,
+                message=f"文档处理成功，生成了 {result.chunk_count} 个文档片段",
+                file_path=result.resolved_path,
+                chunk_count=result.chunk_count
+            )
+        else:
+            results[i] = DocumentProcessResponse(
+                success=False,
+                message="文档未发生变化，跳过处理",
+                file_path=result.resolved_path
+            )
     
     return results
 
@@ -488,9 +777,11 @@ async def delete_document(file_path: str):
         dict: Deletion result
     """
     try:
-        success = vector_store.remove_document(file_path)
+        # Removal updates the indexes and writes files, so keep it off the event loop
+        success = await asyncio.to_thread(vector_store.remove_document, file_path)
         
         if success:
+            semantic_cache.invalidate("rag")
             return {"success": True, "message": f"文档 {file_path} 已从向量存储中删除"}
         else:
             return {"success": False, "message": f"文档 {file_path} 不存在于向量存储中"}
@@ -521,8 +812,10 @@ async def search_documents(
         List[dict]: List of relevant document chunks
     """
     try:
-        results = vector_store.search(
-            query=query, 
+        query_embedding = await vector_store.embed_query_async(query)
+        results = await asyncio.to_thread(
+            vector_store.scan_index,
+            query_embedding,
             file_path=file_path,
             file_name=file_name,
             top_k=top_k
@@ -537,16 +830,60 @@ async def search_documents(
         raise HTTPException(status_code=500, detail=f"文档搜索失败: {str(e)}")
 
 
+@router.post("/rag/search-batch", response_model=List[List[dict]])
+async def search_documents_batch(
+    queries: List[str],
+    file_path: Optional[str] = None,
+    file_name: Optional[str] = None,
+    top_k: int = 5,
+    min_similarity: float = 0.5
+):
+    """
+    Search for relevant document chunks for several queries at once
+    
+    Args:
+        queries (List[str]): Search queries
+        file_path (Optional[str]): Optional file path to limit search scope (for backward compatibility)
+        file_name (Optional[str]): Optional file name to limit search scope (preferred)
+        top_k (int): Number of top results to return per query
+        min_similarity (float): Minimum similarity threshold
+        
+    Returns:
+        List[List[dict]]: Relevant document chunks for each query, in query order
+    """
+    try:
+        query_embeddings = await vector_store.embed_queries_async(queries) if queries else []
+        batch_results = await asyncio.to_thread(
+            vector_store.batch_scan_index,
+            query_embeddings,
+            file_path=file_path,
+            file_name=file_name,
+            top_k=top_k
+        )
+        
+        # Filter by minimum similarity
+        return [
+            [r for r in results if r.get('similarity', 0) >= min_similarity]
+            for results in batch_results
+        ]
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"文档搜索失败: {str(e)}")
+
+
 @router.get("/documents/stats")
 async def get_document_stats():
     """
     Get vector store statistics
     
     Returns:
-        dict: Vector store statistics including file counts, chunks, and storage size
+        dict: Vector store statistics including file counts, chunks, storage size
+            and response cache hit rates
     """
     try:
         stats = vector_store.get_document_stats()
+        stats['semantic_cache'] = semantic_cache.stats()
+        stats['response_cache'] = response_cache.stats()
         return stats
         
     except Exception as e:
@@ -565,45 +902,54 @@ async def chat_with_advanced_rag(request: RAGRequest):
         RAGResponse: AI response with relevant document sources
     """
     try:
-        # Search for relevant document chunks (support both file_name and file_path)
-        search_results = vector_store.search(
-            query=request.message,
+        namespace = (f"rag-advanced:{request.file_name}:{request.file_path}:{request.top_k}:"
+                     f"{request.retrieval_budget}:{request.max_tokens}:{request.temperature}")
+        embedding, cached = await _semantic_cache_lookup(namespace, request.message)
+        if cached is not None:
+            return cached
+        
+        # Without a real message embedding the search falls back to a development
+        # embedding, which must never be stored in the semantic cache
+        search_embedding = embedding
+        if search_embedding is None:
+            search_embedding = await vector_store.embed_query_async(request.message)
+        
+        # Search for relevant document chunks (support both file_name and file_path);
+        # the scan runs in a worker thread so it does not block the event loop
+        search_results = await asyncio.to_thread(
+            vector_store.scan_index,
+            search_embedding,
             file_path=request.file_path,
             file_name=request.file_name,
             top_k=request.top_k * 2  # Get more results for reranking
         )
         
         # Rerank results for better relevance
-        reranked_results = vector_store.rerank_results(search_results, request.message)[:request.top_k]
-        
-        # Build context from reranked results
-        context_parts = []
-        sources = []
+        reranked_results = await asyncio.to_thread(
+            vector_store.rerank_results, search_results, request.message, request.top_k
+        )
         
-        for result in reranked_results:
-            context_parts.append(f"文档片段（相关度: {result.get('combined_score', result['similarity']):.3f}）：{result['content']}")
-            sources.append({
+        # Build context from the reranked results that fit the retrieval budget
+        fitted = _fit_context(reranked_results, request.retrieval_budget)
+        context_parts = [
+            f"文档片段（相关度: {result.get('combined_score', result['similarity']):.3f}）：{content}"
+            for result, content in fitted
+        ]
+        sources = [
+            {
                 'file_path': result['file_path'],
-                'file_name': os.path.basename(result['file_path']),
+                'file_name': result['file_name'],
                 'chunk_index': result['chunk_index'],
                 'similarity': result['similarity'],
                 'combined_score': result.get('combined_score', result['similarity']),
                 'keyword_score': result.get('keyword_score', 0),
-                'content_preview': result['content'][:200] + "..." if len(result['content']) > 200 else result['content']
-            })
-        
-        # Determine game type from file path or content
-        game_type = "通用"
-        system_prompt = "你是桌游专家助手，精通各种桌游规则和策略。"
-        
-        if sources:
-            file_name = os.path.basename(sources[0]['file_path']).lower()
-            if 'splendor' in file_name:
-                game_type = "璀璨宝石（Splendor）"
-                system_prompt = "你是璀璨宝石（Splendor）桌游的专业助手，精通游戏规则和策略。"
-            elif 'catan' in file_name:
-                game_type = "卡坦岛（Catan）"
-                system_prompt = "你是卡坦岛（Catan）桌游的专业助手，精通游戏规则和策略。"
+                'content_preview': result['content_preview']
+            }
+            for result, _ in fitted
+        ]
+        
+        # Game type of the best matching document, tagged at ingest
+        game_type, system_prompt = GAME_PROMPTS[fitted[0][0]['game_type'] if fitted else 'generic']
         
         # Prepare enhanced prompt with context
         if context_parts:
@@ -620,10 +966,9 @@ async def chat_with_advanced_rag(request: RAGRequest):
             prompt = f"作为{game_type}游戏专家，没有找到直接相关的文档内容。请基于你的游戏知识回答用户问题：{request.message}"
         
         # Call AI model
-        client = get_ai_client()
         model = get_ai_model()
         
-        response = client.chat.completions.create(
+        response = await _create_completion(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -633,12 +978,17 @@ async def chat_with_advanced_rag(request: RAGRequest):
             temperature=request.temperature
         )
         
-        return RAGResponse(
+        result = RAGResponse(
             response=response.choices[0].message.content,
             model=model,
             sources=sources,
-            usage=response.usage.dict() if response.usage else None
+            usage=response.usage.model_dump() if response.usage else None
         )
+        if embedding is not None:
+            semantic_cache.store(namespace, embedding, result)
+        return result
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=AI_BUSY_MESSAGE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"高级RAG服务调用失败: {str(e)}")
@@ -1,7 +1,8 @@
 """
 Health check endpoints for the Gugugu API
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 from api.models.schemas import HealthResponse
 
 router = APIRouter(
@@ -10,6 +11,9 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# The health body never changes, so it is serialized once at import
+HEALTH_RESPONSE = JSONResponse(HealthResponse(status="healthy").model_dump())
+
 
 @router.get("/", response_model=HealthResponse)
 async def health_check():
@@ -17,6 +21,19 @@ async def health_check():
     Basic health check endpoint
     
     Returns:
-        HealthResponse: Status of the API service
+        JSONResponse: Prebuilt HealthResponse body with the service status
+    """
+    return HEALTH_RESPONSE
+
+
+async def liveness_probe(request: Request) -> JSONResponse:
+    """
+    Liveness probe for /health, mounted as a plain Starlette route
+    
+    Skips FastAPI's dependency resolution and validation, so frequent
+    orchestrator probes cost next to nothing.
+    
+    Returns:
+        JSONResponse: Prebuilt HealthResponse body with the service status
     """
-    return HealthResponse(status="healthy")
+    return HEALTH_RESPONSE
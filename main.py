@@ -2,19 +2,50 @@
 Main application entry point for the Gugugu API
 Modular FastAPI application with organized route handlers
 """
-from fastapi import FastAPI
+import os
+import sys
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import uvicorn
 
+try:
+    import uvloop  # noqa: F401
+    EVENT_LOOP = "uvloop"
+except ImportError:  # uvicorn[standard] does not install uvloop on Windows
+    EVENT_LOOP = "asyncio"
+
 # Import routers
 from api.routers import health, ai
-from api.core.config import get_debug_mode
+from api.core.config import get_debug_mode, prewarm_ai_connections, close_ai_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: pre-warm AI service connections, build the OpenAPI
+    schema and start the AI health refresher on startup, stop it and release
+    the shared AI HTTP client on shutdown
+    """
+    await prewarm_ai_connections()
+    # Build the OpenAPI schema now; FastAPI keeps it, so /docs never pays for it
+    app.openapi()
+    health_refresher = asyncio.create_task(ai.refresh_ai_health())
+    yield
+    health_refresher.cancel()
+    with suppress(asyncio.CancelledError):
+        await health_refresher
+    await close_ai_client()
+
 
 # Create FastAPI application instance
 app = FastAPI(
     title="Gugugu API",
     description="一个使用FastAPI构建的API服务，集成AI对话功能",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -31,24 +62,68 @@ app.include_router(health.router)
 app.include_router(ai.router)
 
 
+# The welcome body never changes, so it is serialized once at import
+ROOT_RESPONSE = JSONResponse({"message": "欢迎使用Gugugu API!"})
+
+
 # Root route
-@app.get("/")
-async def root():
+async def root(request: Request):
     """
     Root endpoint with welcome message
     
     Returns:
-        dict: Welcome message
+        JSONResponse: Prebuilt welcome message
+    """
+    return ROOT_RESPONSE
+
+
+# / and /health are plain Starlette routes, bypassing FastAPI's request handling
+app.add_route("/", root, methods=["GET"])
+app.add_route("/health", health.liveness_probe, methods=["GET"])
+
+
+def uringcore_loop_factory() -> asyncio.AbstractEventLoop:
+    """Create an io_uring based uringcore event loop (uvicorn custom loop factory)"""
+    import uringcore
+    return uringcore.EventLoopPolicy().new_event_loop()
+
+
+def select_event_loop() -> str:
+    """
+    Choose the event loop implementation passed to uvicorn
+    
+    On Linux with USE_URINGCORE=1, selects the io_uring based uringcore
+    event loop (needs kernel 5.11+). It is passed as an import string, so
+    uvicorn also uses it in reload and worker subprocesses, which do not
+    run this module's __main__ block. Otherwise uvloop is used where
+    available.
+    
+    Returns:
+        str: Value for uvicorn's loop setting
     """
-    return {"message": "欢迎使用Gugugu API!"}
+    if sys.platform == "linux" and os.getenv("USE_URINGCORE") == "1":
+        try:
+            import uringcore  # noqa: F401
+        except ImportError:
+            print("USE_URINGCORE=1 but uringcore is not installed, falling back to", EVENT_LOOP)
+        else:
+            return "main:uringcore_loop_factory"
+    return EVENT_LOOP
 
 
 # Application entry point
 if __name__ == "__main__":
     reload = get_debug_mode()
+    
+    # Each worker keeps its own vector store and caches in memory, so more
+    # than one worker is opt-in; reload mode always runs a single worker
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", "1"))
     uvicorn.run(
         "main:app", 
         host="0.0.0.0", 
         port=8000, 
-        reload=reload
+        reload=reload,
+        workers=workers,
+        loop=select_event_loop(),
+        http="httptools"
     )
\ No newline at end of file